@@ -6,6 +6,7 @@ spill/pause/terminate mechanics on the Worker side.
 """
 from __future__ import annotations
 
+import asyncio
 import logging
 from collections import defaultdict
 from collections.abc import Generator
@@ -556,10 +557,13 @@ class RetireWorker(ActiveMemoryManagerPolicy):
 
     address: str
     no_recipients: bool
+    #: Set whenever :meth:`done` or ``no_recipients`` may have changed
+    wake: asyncio.Event
 
     def __init__(self, address: str):
         self.address = address
         self.no_recipients = False
+        self.wake = asyncio.Event()
 
     def __repr__(self) -> str:
         return f"RetireWorker({self.address!r})"
@@ -625,6 +629,7 @@ class RetireWorker(ActiveMemoryManagerPolicy):
             #      code to wait for paused workers and only exit immediately if all
             #      workers are in closing_gracefully status.
             self.no_recipients = True
+            self.wake.set()
             logger.warning(
                 f"Tried retiring worker {self.address}, but {nno_rec} tasks could not "
                 "be moved as there are no suitable workers to receive them. "
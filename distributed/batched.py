@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import logging
 from collections import deque
 
@@ -133,6 +135,13 @@ class BatchedSend:
 
         This completes quickly and synchronously
         """
+        self.extend(msgs)
+
+    def extend(self, msgs: list | tuple) -> None:
+        """Schedule a sequence of messages for sending to the other side
+
+        Like ``send(*msgs)``, without unpacking *msgs* into a new tuple
+        """
         if self.comm is not None and self.comm.closed():
             raise CommClosedError(f"Comm {self.comm!r} already closed.")
 
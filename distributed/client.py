@@ -906,8 +906,10 @@ class Client(SyncMethodMixin):
 
         self._stream_handlers = {
             "key-in-memory": self._handle_key_in_memory,
+            "keys-in-memory": self._handle_keys_in_memory,
             "lost-data": self._handle_lost_data,
             "cancelled-key": self._handle_cancelled_key,
+            "cancelled-keys": self._handle_cancelled_keys,
             "task-retried": self._handle_retried_key,
             "task-erred": self._handle_task_erred,
             "restart": self._handle_restart,
@@ -1445,6 +1447,10 @@ class Client(SyncMethodMixin):
                 type = None
             state.finish(type)
 
+    def _handle_keys_in_memory(self, keys=()):
+        for key in keys:
+            self._handle_key_in_memory(key)
+
     def _handle_lost_data(self, key=None):
         state = self.futures.get(key)
         if state is not None:
@@ -1455,6 +1461,10 @@ class Client(SyncMethodMixin):
         if state is not None:
             state.cancel()
 
+    def _handle_cancelled_keys(self, keys=()):
+        for key in keys:
+            self._handle_cancelled_key(key)
+
     def _handle_retried_key(self, key=None):
         state = self.futures.get(key)
         if state is not None:
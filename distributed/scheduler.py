@@ -26,7 +26,7 @@ from collections.abc import (
 )
 from contextlib import suppress
 from datetime import timedelta
-from functools import partial
+from functools import lru_cache, partial, wraps
 from numbers import Number
 from typing import Any, ClassVar, Dict, Literal
 from typing import cast as pep484_cast
@@ -42,7 +42,6 @@ from tlz import (
     merge_with,
     partition,
     pluck,
-    second,
     valmap,
 )
 from tornado.ioloop import IOLoop, PeriodicCallback
@@ -93,6 +92,7 @@ from distributed.utils import (
     key_split_group,
     log_errors,
     no_default,
+    offload,
     recursive_to_dict,
     validate_key,
 )
@@ -197,6 +197,32 @@ COMPILED = declare(bint, compiled)
 globals()["COMPILED"] = COMPILED
 
 
+def _log_transition_errors(func):
+    """Log exceptions raised by a ``transition_*`` method and optionally drop
+    into pdb.
+
+    ``SchedulerState._transition`` already logs any failure, so in production
+    (no ``distributed.admin.pdb-on-err`` and no debug logging) the method is
+    returned unwrapped to keep the exception handling out of the hot path.
+    """
+    if not LOG_PDB and not logger.isEnabledFor(logging.DEBUG):
+        return func
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        except Exception as e:
+            logger.exception(e)
+            if LOG_PDB:
+                import pdb
+
+                pdb.set_trace()
+            raise
+
+    return wrapper
+
+
 @final
 @cclass
 class ClientState:
@@ -534,6 +560,9 @@ class WorkerState:
     _last_seen: double
     _local_directory: str
     _memory_limit: Py_ssize_t
+    # (timestamp, unmanaged memory) samples from the last MEMORY_RECENT_TO_OLD_TIME
+    # seconds, pruned so that sizes are strictly increasing; the first element is
+    # always the minimum.
     _memory_other_history: "deque[tuple[float, Py_ssize_t]]"
     _memory_unmanaged_old: Py_ssize_t
     _metrics: dict
@@ -935,6 +964,15 @@ class TaskPrefix:
 
        Numbers of times a task was marked as suspicious with this prefix
 
+    .. attribute:: nbytes_known: int
+
+       The sum of the sizes of the tasks with this prefix that are currently known
+       to the scheduler and whose size has been reported
+
+    .. attribute:: n_nbytes_known: int
+
+       The number of tasks summed up by ``nbytes_known``
+
 
     See Also
     --------
@@ -946,10 +984,14 @@ class TaskPrefix:
     _duration_average: double
     _suspicious: Py_ssize_t
     _groups: list
+    _nbytes_known: Py_ssize_t
+    _n_nbytes_known: Py_ssize_t
 
     def __init__(self, name: str):
         self._name = name
         self._groups = []
+        self._nbytes_known = 0
+        self._n_nbytes_known = 0
 
         # store timings for each prefix-action
         self._all_durations = defaultdict(float)
@@ -989,6 +1031,14 @@ class TaskPrefix:
     def suspicious(self) -> Py_ssize_t:
         return self._suspicious
 
+    @property
+    def nbytes_known(self) -> Py_ssize_t:
+        return self._nbytes_known
+
+    @property
+    def n_nbytes_known(self) -> Py_ssize_t:
+        return self._n_nbytes_known
+
     @property
     def groups(self):
         return self._groups
@@ -1482,7 +1532,7 @@ class TaskState:
     _traceback: object
     _traceback_text: str
     _exception_blame: "TaskState"  # TaskState | None"
-    _erred_on: set
+    _erred_on: set  # set[str] | None, created on the first error
     _suspicious: Py_ssize_t
     _host_restrictions: set  # set[str] | None
     _worker_restrictions: set  # set[str] | None
@@ -1579,7 +1629,7 @@ class TaskState:
         self._group = None  # type: ignore
         self._metadata = {}
         self._annotations = {}
-        self._erred_on = set()
+        self._erred_on = None  # type: ignore
 
     def __hash__(self):
         return self._hash
@@ -1665,6 +1715,16 @@ class TaskState:
 
     @nbytes.setter
     def nbytes(self, v: Py_ssize_t):
+        # Keep the prefix's known-size counters in sync like set_nbytes does, but
+        # leave group and worker totals to the caller
+        tp: TaskPrefix = self._prefix
+        if tp is not None:
+            if self._nbytes >= 0:
+                tp._nbytes_known -= self._nbytes
+                tp._n_nbytes_known -= 1
+            if v >= 0:
+                tp._nbytes_known += v
+                tp._n_nbytes_known += 1
         self._nbytes = v
 
     @property
@@ -1737,7 +1797,7 @@ class TaskState:
 
     @property
     def erred_on(self):
-        return self._erred_on
+        return self._erred_on if self._erred_on is not None else set()
 
     @ccall
     def add_dependency(self, other: "TaskState"):
@@ -1758,7 +1818,10 @@ class TaskState:
         old_nbytes: Py_ssize_t = self._nbytes
         if old_nbytes >= 0:
             diff -= old_nbytes
+        else:
+            self._prefix._n_nbytes_known += 1
         self._group._nbytes_total += diff
+        self._prefix._nbytes_known += diff
         ws: WorkerState
         for ws in self._who_has:
             ws._nbytes += diff
@@ -1984,6 +2047,7 @@ class SchedulerState:
     _aliases: dict
     _bandwidth: double
     _clients: dict  # dict[str, ClientState]
+    _fire_and_forget: ClientState
     _computations: object
     _extensions: dict
     _host_info: dict
@@ -1998,6 +2062,7 @@ class SchedulerState:
     _task_prefixes: dict
     _task_metadata: dict
     _replicated_tasks: set
+    _retiring: dict  # dict[WorkerState, asyncio.Event]
     _total_nthreads: Py_ssize_t
     _total_occupancy: double
     _transitions_table: dict
@@ -2008,6 +2073,9 @@ class SchedulerState:
     _workers_dv: dict  # dict[str, WorkerState]
     _transition_counter: Py_ssize_t
     _plugins: dict  # dict[str, SchedulerPlugin]
+    # Snapshot of _plugins.values(), refreshed by add_plugin and remove_plugin
+    _plugins_tuple: tuple
+    _stealing_ext: object  # WorkStealing | None
 
     # Variables from dask.config, cached by __init__ for performance
     UNKNOWN_TASK_DURATION: double
@@ -2035,7 +2103,8 @@ class SchedulerState:
             dask.config.get("distributed.scheduler.bandwidth")
         )
         self._clients = clients
-        self._clients["fire-and-forget"] = ClientState("fire-and-forget")
+        self._fire_and_forget = ClientState("fire-and-forget")
+        self._clients["fire-and-forget"] = self._fire_and_forget
         self._extensions = {}
         self._host_info = host_info
         self._idle = SortedDict()
@@ -2048,6 +2117,9 @@ class SchedulerState:
         self._replicated_tasks = {
             ts for ts in self._tasks.values() if len(ts._who_has) > 1
         }
+        # Workers being retired, and the event to set whenever their retirement may
+        # have completed; see Scheduler.retire_workers
+        self._retiring = {}
         self._computations = deque(
             maxlen=dask.config.get("distributed.diagnostics.computations.max-history")
         )
@@ -2083,6 +2155,10 @@ class SchedulerState:
             ws for ws in self._workers.values() if ws.status == Status.running
         }
         self._plugins = {} if not plugins else {_get_plugin_name(p): p for p in plugins}
+        # Snapshot iterated on hot paths; rebuilt by add_plugin/remove_plugin
+        self._plugins_tuple = tuple(self._plugins.values())
+        # Set by Scheduler.__init__ once the extensions have been instantiated
+        self._stealing_ext = None
 
         # Variables from dask.config, cached by __init__ for performance
         self.UNKNOWN_TASK_DURATION = parse_timedelta(
@@ -2249,20 +2325,23 @@ class SchedulerState:
         ts._state = state
 
         tp: TaskPrefix
-        prefix_key = key_split(key)
-        tp = self._task_prefixes.get(prefix_key)  # type: ignore
-        if tp is None:
-            self._task_prefixes[prefix_key] = tp = TaskPrefix(prefix_key)
-        ts._prefix = tp
-
         group_key = ts._group_key
         tg: TaskGroup = self._task_groups.get(group_key)  # type: ignore
-        if tg is None:
+        if tg is not None:
+            # All tasks of a group share its prefix; skip key_split, which is
+            # cached by key and therefore misses for every new chunk of a collection
+            tp = tg._prefix
+        else:
+            prefix_key = key_split(key)
+            tp = self._task_prefixes.get(prefix_key)  # type: ignore
+            if tp is None:
+                self._task_prefixes[prefix_key] = tp = TaskPrefix(prefix_key)
             self._task_groups[group_key] = tg = TaskGroup(group_key)
             if computation:
                 computation.groups.add(tg)
             tg._prefix = tp
             tp._groups.append(tg)
+        ts._prefix = tp
         tg.add(ts)
 
         self._tasks[key] = ts
@@ -2302,18 +2381,14 @@ class SchedulerState:
         dependents: set
         dependencies: set
         try:
-            recommendations = {}
-            worker_msgs = {}
-            client_msgs = {}
-
             ts = parent._tasks.get(key)  # type: ignore
             if ts is None:
-                return recommendations, client_msgs, worker_msgs
+                return {}, {}, {}
             start = ts._state
             if start == finish:
-                return recommendations, client_msgs, worker_msgs
+                return {}, {}, {}
 
-            if self.plugins:
+            if parent._plugins:
                 dependents = set(ts._dependents)
                 dependencies = set(ts._dependencies)
 
@@ -2324,6 +2399,9 @@ class SchedulerState:
                 self._transition_counter += 1
             elif "released" not in start_finish:
                 assert not args and not kwargs, (args, kwargs, start_finish)
+                recommendations = {}
+                worker_msgs = {}
+                client_msgs = {}
                 a_recs: dict
                 a_cmsgs: dict
                 a_wmsgs: dict
@@ -2385,13 +2463,13 @@ class SchedulerState:
                     ts._state,
                     dict(recommendations),
                 )
-            if self.plugins:
+            if parent._plugins:
                 # Temporarily put back forgotten key for plugin to retrieve it
                 if ts._state == "forgotten":
                     ts._dependents = dependents
                     ts._dependencies = dependencies
                     parent._tasks[ts._key] = ts
-                for plugin in list(self.plugins.values()):
+                for plugin in parent._plugins_tuple:
                     try:
                         plugin.transition(key, start, finish2, *args, **kwargs)
                     except Exception:
@@ -2461,143 +2539,122 @@ class SchedulerState:
             for key in keys:
                 scheduler.validate_key(key)
 
+    @_log_transition_errors
     def transition_released_waiting(self, key):
-        try:
-            ts: TaskState = self._tasks[key]
-            dts: TaskState
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert ts._run_spec
-                assert not ts._waiting_on
-                assert not ts._who_has
-                assert not ts._processing_on
-                assert not any([dts._state == "forgotten" for dts in ts._dependencies])
-
-            if ts._has_lost_dependencies:
-                recommendations[key] = "forgotten"
-                return recommendations, client_msgs, worker_msgs
+        ts: TaskState = self._tasks[key]
+        dts: TaskState
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            ts.state = "waiting"
+        if self._validate:
+            assert ts._run_spec
+            assert not ts._waiting_on
+            assert not ts._who_has
+            assert not ts._processing_on
+            assert not any([dts._state == "forgotten" for dts in ts._dependencies])
+
+        if ts._has_lost_dependencies:
+            recommendations[key] = "forgotten"
+            return recommendations, client_msgs, worker_msgs
 
-            dts: TaskState
-            for dts in ts._dependencies:
-                if dts._exception_blame:
-                    ts._exception_blame = dts._exception_blame
-                    recommendations[key] = "erred"
-                    return recommendations, client_msgs, worker_msgs
+        ts.state = "waiting"
 
-            for dts in ts._dependencies:
-                dep = dts._key
-                if not dts._who_has:
-                    ts._waiting_on.add(dts)
-                if dts._state == "released":
-                    recommendations[dep] = "waiting"
-                else:
-                    dts._waiters.add(ts)
+        dts: TaskState
+        for dts in ts._dependencies:
+            if dts._exception_blame:
+                ts._exception_blame = dts._exception_blame
+                recommendations[key] = "erred"
+                return recommendations, client_msgs, worker_msgs
 
-            ts._waiters = {dts for dts in ts._dependents if dts._state == "waiting"}
+        for dts in ts._dependencies:
+            dep = dts._key
+            if not dts._who_has:
+                ts._waiting_on.add(dts)
+            if dts._state == "released":
+                recommendations[dep] = "waiting"
+            else:
+                dts._waiters.add(ts)
 
-            if not ts._waiting_on:
-                if self._workers_dv:
-                    recommendations[key] = "processing"
-                else:
-                    self._unrunnable.add(ts)
-                    ts.state = "no-worker"
+        ts._waiters = {dts for dts in ts._dependents if dts._state == "waiting"}
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        if not ts._waiting_on:
+            if self._workers_dv:
+                recommendations[key] = "processing"
+            else:
+                self._unrunnable.add(ts)
+                ts.state = "no-worker"
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_no_worker_waiting(self, key):
-        try:
-            ts: TaskState = self._tasks[key]
-            dts: TaskState
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert ts in self._unrunnable
-                assert not ts._waiting_on
-                assert not ts._who_has
-                assert not ts._processing_on
+        ts: TaskState = self._tasks[key]
+        dts: TaskState
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            self._unrunnable.remove(ts)
+        if self._validate:
+            assert ts in self._unrunnable
+            assert not ts._waiting_on
+            assert not ts._who_has
+            assert not ts._processing_on
 
-            if ts._has_lost_dependencies:
-                recommendations[key] = "forgotten"
-                return recommendations, client_msgs, worker_msgs
+        self._unrunnable.remove(ts)
 
-            for dts in ts._dependencies:
-                dep = dts._key
-                if not dts._who_has:
-                    ts._waiting_on.add(dts)
-                if dts._state == "released":
-                    recommendations[dep] = "waiting"
-                else:
-                    dts._waiters.add(ts)
+        if ts._has_lost_dependencies:
+            recommendations[key] = "forgotten"
+            return recommendations, client_msgs, worker_msgs
 
-            ts.state = "waiting"
+        for dts in ts._dependencies:
+            dep = dts._key
+            if not dts._who_has:
+                ts._waiting_on.add(dts)
+            if dts._state == "released":
+                recommendations[dep] = "waiting"
+            else:
+                dts._waiters.add(ts)
 
-            if not ts._waiting_on:
-                if self._workers_dv:
-                    recommendations[key] = "processing"
-                else:
-                    self._unrunnable.add(ts)
-                    ts.state = "no-worker"
+        ts.state = "waiting"
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        if not ts._waiting_on:
+            if self._workers_dv:
+                recommendations[key] = "processing"
+            else:
+                self._unrunnable.add(ts)
+                ts.state = "no-worker"
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_no_worker_memory(
         self, key, nbytes=None, type=None, typename: str = None, worker=None
     ):
-        try:
-            ws: WorkerState = self._workers_dv[worker]
-            ts: TaskState = self._tasks[key]
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert not ts._processing_on
-                assert not ts._waiting_on
-                assert ts._state == "no-worker"
+        ws: WorkerState = self._workers_dv[worker]
+        ts: TaskState = self._tasks[key]
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            self._unrunnable.remove(ts)
+        if self._validate:
+            assert not ts._processing_on
+            assert not ts._waiting_on
+            assert ts._state == "no-worker"
 
-            if nbytes is not None:
-                ts.set_nbytes(nbytes)
+        self._unrunnable.remove(ts)
 
-            self.check_idle_saturated(ws)
+        if nbytes is not None:
+            ts.set_nbytes(nbytes)
 
-            _add_to_memory(
-                self, ts, ws, recommendations, client_msgs, type=type, typename=typename
-            )
-            ts.state = "memory"
+        self.check_idle_saturated(ws)
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        _add_to_memory(
+            self, ts, ws, recommendations, client_msgs, type=type, typename=typename
+        )
+        ts.state = "memory"
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
     @ccall
     @exceptval(check=False)
@@ -2726,91 +2783,78 @@ class SchedulerState:
 
         return total_duration
 
+    @_log_transition_errors
     def transition_waiting_processing(self, key):
-        try:
-            ts: TaskState = self._tasks[key]
-            dts: TaskState
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert not ts._waiting_on
-                assert not ts._who_has
-                assert not ts._exception_blame
-                assert not ts._processing_on
-                assert not ts._has_lost_dependencies
-                assert ts not in self._unrunnable
-                assert all([dts._who_has for dts in ts._dependencies])
-
-            ws: WorkerState = self.decide_worker(ts)
-            if ws is None:
-                return recommendations, client_msgs, worker_msgs
-            worker = ws._address
+        ts: TaskState = self._tasks[key]
+        dts: TaskState
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            self.set_duration_estimate(ts, ws)
-            ts._processing_on = ws
-            ts.state = "processing"
-            self.consume_resources(ts, ws)
-            self.check_idle_saturated(ws)
-            self._n_tasks += 1
+        if self._validate:
+            assert not ts._waiting_on
+            assert not ts._who_has
+            assert not ts._exception_blame
+            assert not ts._processing_on
+            assert not ts._has_lost_dependencies
+            assert ts not in self._unrunnable
+            assert all([dts._who_has for dts in ts._dependencies])
+
+        ws: WorkerState = self.decide_worker(ts)
+        if ws is None:
+            return recommendations, client_msgs, worker_msgs
+        worker = ws._address
 
-            if ts._actor:
-                ws._actors.add(ts)
+        self.set_duration_estimate(ts, ws)
+        ts._processing_on = ws
+        ts.state = "processing"
+        self.consume_resources(ts, ws)
+        self.check_idle_saturated(ws)
+        self._n_tasks += 1
 
-            # logger.debug("Send job to worker: %s, %s", worker, key)
+        if ts._actor:
+            ws._actors.add(ts)
 
-            worker_msgs[worker] = [_task_to_msg(self, ts)]
+        # logger.debug("Send job to worker: %s, %s", worker, key)
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        worker_msgs[worker] = [_task_to_msg(self, ts)]
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_waiting_memory(
         self, key, nbytes=None, type=None, typename: str = None, worker=None, **kwargs
     ):
-        try:
-            ws: WorkerState = self._workers_dv[worker]
-            ts: TaskState = self._tasks[key]
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert not ts._processing_on
-                assert ts._waiting_on
-                assert ts._state == "waiting"
+        ws: WorkerState = self._workers_dv[worker]
+        ts: TaskState = self._tasks[key]
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            ts._waiting_on.clear()
+        if self._validate:
+            assert not ts._processing_on
+            assert ts._waiting_on
+            assert ts._state == "waiting"
 
-            if nbytes is not None:
-                ts.set_nbytes(nbytes)
+        ts._waiting_on.clear()
 
-            self.check_idle_saturated(ws)
+        if nbytes is not None:
+            ts.set_nbytes(nbytes)
 
-            _add_to_memory(
-                self, ts, ws, recommendations, client_msgs, type=type, typename=typename
-            )
+        self.check_idle_saturated(ws)
 
-            if self._validate:
-                assert not ts._processing_on
-                assert not ts._waiting_on
-                assert ts._who_has
+        _add_to_memory(
+            self, ts, ws, recommendations, client_msgs, type=type, typename=typename
+        )
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        if self._validate:
+            assert not ts._processing_on
+            assert not ts._waiting_on
+            assert ts._who_has
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_processing_memory(
         self,
         key,
@@ -2826,338 +2870,297 @@ class SchedulerState:
         recommendations: dict = {}
         client_msgs: dict = {}
         worker_msgs: dict = {}
-        try:
-            ts: TaskState = self._tasks[key]
+        ts: TaskState = self._tasks[key]
 
-            assert worker
-            assert isinstance(worker, str)
+        assert worker
+        assert isinstance(worker, str)
 
-            if self._validate:
-                assert ts._processing_on
-                ws = ts._processing_on
-                assert ts in ws._processing
-                assert not ts._waiting_on
-                assert not ts._who_has, (ts, ts._who_has)
-                assert not ts._exception_blame
-                assert ts._state == "processing"
+        if self._validate:
+            assert ts._processing_on
+            ws = ts._processing_on
+            assert ts in ws._processing
+            assert not ts._waiting_on
+            assert not ts._who_has, (ts, ts._who_has)
+            assert not ts._exception_blame
+            assert ts._state == "processing"
+
+        ws = self._workers_dv.get(worker)  # type: ignore
+        if ws is None:
+            recommendations[key] = "released"
+            return recommendations, client_msgs, worker_msgs
 
-            ws = self._workers_dv.get(worker)  # type: ignore
-            if ws is None:
-                recommendations[key] = "released"
-                return recommendations, client_msgs, worker_msgs
+        if ws != ts._processing_on:  # someone else has this task
+            logger.info(
+                "Unexpected worker completed task. Expected: %s, Got: %s, Key: %s",
+                ts._processing_on,
+                ws,
+                key,
+            )
+            worker_msgs[ts._processing_on.address] = [
+                {
+                    "op": "cancel-compute",
+                    "key": key,
+                    "stimulus_id": f"processing-memory-{time()}",
+                }
+            ]
 
-            if ws != ts._processing_on:  # someone else has this task
-                logger.info(
-                    "Unexpected worker completed task. Expected: %s, Got: %s, Key: %s",
-                    ts._processing_on,
-                    ws,
-                    key,
+        #############################
+        # Update Timing Information #
+        #############################
+        if startstops:
+            startstop: dict
+            for startstop in startstops:
+                ts._group.add_duration(
+                    stop=startstop["stop"],
+                    start=startstop["start"],
+                    action=startstop["action"],
                 )
-                worker_msgs[ts._processing_on.address] = [
-                    {
-                        "op": "cancel-compute",
-                        "key": key,
-                        "stimulus_id": f"processing-memory-{time()}",
-                    }
-                ]
-
-            #############################
-            # Update Timing Information #
-            #############################
-            if startstops:
-                startstop: dict
-                for startstop in startstops:
-                    ts._group.add_duration(
-                        stop=startstop["stop"],
-                        start=startstop["start"],
-                        action=startstop["action"],
-                    )
 
-            s: set = self._unknown_durations.pop(ts._prefix._name, set())
-            tts: TaskState
-            steal = self.extensions.get("stealing")
-            for tts in s:
-                if tts._processing_on:
-                    self.set_duration_estimate(tts, tts._processing_on)
-                    if steal:
-                        steal.recalculate_cost(tts)
-
-            ############################
-            # Update State Information #
-            ############################
-            if nbytes is not None:
-                ts.set_nbytes(nbytes)
-
-            _remove_from_processing(self, ts)
-
-            _add_to_memory(
-                self, ts, ws, recommendations, client_msgs, type=type, typename=typename
-            )
-
-            if self._validate:
-                assert not ts._processing_on
-                assert not ts._waiting_on
+        s: set = self._unknown_durations.pop(ts._prefix._name, set())
+        tts: TaskState
+        steal = self._stealing_ext
+        for tts in s:
+            if tts._processing_on:
+                self.set_duration_estimate(tts, tts._processing_on)
+                if steal:
+                    steal.recalculate_cost(tts)
+
+        ############################
+        # Update State Information #
+        ############################
+        if nbytes is not None:
+            ts.set_nbytes(nbytes)
+
+        _remove_from_processing(self, ts)
+
+        _add_to_memory(
+            self, ts, ws, recommendations, client_msgs, type=type, typename=typename
+        )
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        if self._validate:
+            assert not ts._processing_on
+            assert not ts._waiting_on
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_memory_released(self, key, safe: bint = False):
         ws: WorkerState
-        try:
-            ts: TaskState = self._tasks[key]
-            dts: TaskState
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
+        ts: TaskState = self._tasks[key]
+        dts: TaskState
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            if self._validate:
-                assert not ts._waiting_on
-                assert not ts._processing_on
-                if safe:
-                    assert not ts._waiters
-
-            if ts._actor:
-                for ws in ts._who_has:
-                    ws._actors.discard(ts)
-                if ts._who_wants:
-                    ts._exception_blame = ts
-                    ts._exception = "Worker holding Actor was lost"
-                    recommendations[ts._key] = "erred"
-                    return (
-                        recommendations,
-                        client_msgs,
-                        worker_msgs,
-                    )  # don't try to recreate
-
-            for dts in ts._waiters:
-                if dts._state in ("no-worker", "processing"):
-                    recommendations[dts._key] = "waiting"
-                elif dts._state == "waiting":
-                    dts._waiting_on.add(ts)
-
-            # XXX factor this out?
-            worker_msg = {
-                "op": "free-keys",
-                "keys": [key],
-                "stimulus_id": f"memory-released-{time()}",
-            }
-            for ws in ts._who_has:
-                worker_msgs[ws._address] = [worker_msg]
-            self.remove_all_replicas(ts)
+        if self._validate:
+            assert not ts._waiting_on
+            assert not ts._processing_on
+            if safe:
+                assert not ts._waiters
 
-            ts.state = "released"
+        if ts._actor:
+            for ws in ts._who_has:
+                ws._actors.discard(ts)
+            if ts._who_wants:
+                ts._exception_blame = ts
+                ts._exception = "Worker holding Actor was lost"
+                recommendations[ts._key] = "erred"
+                return (
+                    recommendations,
+                    client_msgs,
+                    worker_msgs,
+                )  # don't try to recreate
+
+        for dts in ts._waiters:
+            if dts._state in ("no-worker", "processing"):
+                recommendations[dts._key] = "waiting"
+            elif dts._state == "waiting":
+                dts._waiting_on.add(ts)
+
+        # XXX factor this out?
+        worker_msg = {
+            "op": "free-keys",
+            "keys": [key],
+            "stimulus_id": f"memory-released-{time()}",
+        }
+        for ws in ts._who_has:
+            worker_msgs[ws._address] = [worker_msg]
+        self.remove_all_replicas(ts)
 
-            report_msg = {"op": "lost-data", "key": key}
-            cs: ClientState
-            for cs in ts._who_wants:
-                client_msgs[cs._client_key] = [report_msg]
+        ts.state = "released"
 
-            if not ts._run_spec:  # pure data
-                recommendations[key] = "forgotten"
-            elif ts._has_lost_dependencies:
-                recommendations[key] = "forgotten"
-            elif ts._who_wants or ts._waiters:
-                recommendations[key] = "waiting"
+        report_msg = {"op": "lost-data", "key": key}
+        cs: ClientState
+        for cs in ts._who_wants:
+            client_msgs[cs._client_key] = [report_msg]
 
-            if self._validate:
-                assert not ts._waiting_on
+        if not ts._run_spec:  # pure data
+            recommendations[key] = "forgotten"
+        elif ts._has_lost_dependencies:
+            recommendations[key] = "forgotten"
+        elif ts._who_wants or ts._waiters:
+            recommendations[key] = "waiting"
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        if self._validate:
+            assert not ts._waiting_on
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_released_erred(self, key):
-        try:
-            ts: TaskState = self._tasks[key]
-            dts: TaskState
-            failing_ts: TaskState
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
+        ts: TaskState = self._tasks[key]
+        dts: TaskState
+        failing_ts: TaskState
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            if self._validate:
-                with log_errors(pdb=LOG_PDB):
-                    assert ts._exception_blame
-                    assert not ts._who_has
-                    assert not ts._waiting_on
-                    assert not ts._waiters
-
-            failing_ts = ts._exception_blame
-
-            for dts in ts._dependents:
-                dts._exception_blame = failing_ts
-                if not dts._who_has:
-                    recommendations[dts._key] = "erred"
-
-            report_msg = {
-                "op": "task-erred",
-                "key": key,
-                "exception": failing_ts._exception,
-                "traceback": failing_ts._traceback,
-            }
-            cs: ClientState
-            for cs in ts._who_wants:
-                client_msgs[cs._client_key] = [report_msg]
+        if self._validate:
+            with log_errors(pdb=LOG_PDB):
+                assert ts._exception_blame
+                assert not ts._who_has
+                assert not ts._waiting_on
+                assert not ts._waiters
 
-            ts.state = "erred"
+        failing_ts = ts._exception_blame
 
-            # TODO: waiting data?
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        for dts in ts._dependents:
+            dts._exception_blame = failing_ts
+            if not dts._who_has:
+                recommendations[dts._key] = "erred"
 
-                pdb.set_trace()
-            raise
+        report_msg = {
+            "op": "task-erred",
+            "key": key,
+            "exception": failing_ts._exception,
+            "traceback": failing_ts._traceback,
+        }
+        cs: ClientState
+        for cs in ts._who_wants:
+            client_msgs[cs._client_key] = [report_msg]
 
+        ts.state = "erred"
+
+        # TODO: waiting data?
+        return recommendations, client_msgs, worker_msgs
+
+    @_log_transition_errors
     def transition_erred_released(self, key):
-        try:
-            ts: TaskState = self._tasks[key]
-            dts: TaskState
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
+        ts: TaskState = self._tasks[key]
+        dts: TaskState
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            if self._validate:
-                with log_errors(pdb=LOG_PDB):
-                    assert ts._exception_blame
-                    assert not ts._who_has
-                    assert not ts._waiting_on
-                    assert not ts._waiters
-
-            ts._exception = None
-            ts._exception_blame = None
-            ts._traceback = None
-
-            for dts in ts._dependents:
-                if dts._state == "erred":
-                    recommendations[dts._key] = "waiting"
-
-            w_msg = {
-                "op": "free-keys",
-                "keys": [key],
-                "stimulus_id": f"erred-released-{time()}",
-            }
+        if self._validate:
+            with log_errors(pdb=LOG_PDB):
+                assert ts._exception_blame
+                assert not ts._who_has
+                assert not ts._waiting_on
+                assert not ts._waiters
+
+        ts._exception = None
+        ts._exception_blame = None
+        ts._traceback = None
+
+        for dts in ts._dependents:
+            if dts._state == "erred":
+                recommendations[dts._key] = "waiting"
+
+        w_msg = {
+            "op": "free-keys",
+            "keys": [key],
+            "stimulus_id": f"erred-released-{time()}",
+        }
+        if ts._erred_on is not None:
             for ws_addr in ts._erred_on:
                 worker_msgs[ws_addr] = [w_msg]
-            ts._erred_on.clear()
+            ts._erred_on = None  # type: ignore
 
-            report_msg = {"op": "task-retried", "key": key}
-            cs: ClientState
-            for cs in ts._who_wants:
-                client_msgs[cs._client_key] = [report_msg]
-
-            ts.state = "released"
+        report_msg = {"op": "task-retried", "key": key}
+        cs: ClientState
+        for cs in ts._who_wants:
+            client_msgs[cs._client_key] = [report_msg]
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        ts.state = "released"
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_waiting_released(self, key):
-        try:
-            ts: TaskState = self._tasks[key]
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert not ts._who_has
-                assert not ts._processing_on
+        ts: TaskState = self._tasks[key]
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            dts: TaskState
-            for dts in ts._dependencies:
-                if ts in dts._waiters:
-                    dts._waiters.discard(ts)
-                    if not dts._waiters and not dts._who_wants:
-                        recommendations[dts._key] = "released"
-            ts._waiting_on.clear()
+        if self._validate:
+            assert not ts._who_has
+            assert not ts._processing_on
 
-            ts.state = "released"
+        dts: TaskState
+        for dts in ts._dependencies:
+            if ts in dts._waiters:
+                dts._waiters.discard(ts)
+                if not dts._waiters and not dts._who_wants:
+                    recommendations[dts._key] = "released"
+        ts._waiting_on.clear()
 
-            if ts._has_lost_dependencies:
-                recommendations[key] = "forgotten"
-            elif not ts._exception_blame and (ts._who_wants or ts._waiters):
-                recommendations[key] = "waiting"
-            else:
-                ts._waiters.clear()
+        ts.state = "released"
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        if ts._has_lost_dependencies:
+            recommendations[key] = "forgotten"
+        elif not ts._exception_blame and (ts._who_wants or ts._waiters):
+            recommendations[key] = "waiting"
+        else:
+            ts._waiters.clear()
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_processing_released(self, key):
-        try:
-            ts: TaskState = self._tasks[key]
-            dts: TaskState
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert ts._processing_on
-                assert not ts._who_has
-                assert not ts._waiting_on
-                assert self._tasks[key].state == "processing"
+        ts: TaskState = self._tasks[key]
+        dts: TaskState
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            w: str = _remove_from_processing(self, ts)
-            if w:
-                worker_msgs[w] = [
-                    {
-                        "op": "free-keys",
-                        "keys": [key],
-                        "stimulus_id": f"processing-released-{time()}",
-                    }
-                ]
+        if self._validate:
+            assert ts._processing_on
+            assert not ts._who_has
+            assert not ts._waiting_on
+            assert self._tasks[key].state == "processing"
 
-            ts.state = "released"
+        w: str = _remove_from_processing(self, ts)
+        if w:
+            worker_msgs[w] = [
+                {
+                    "op": "free-keys",
+                    "keys": [key],
+                    "stimulus_id": f"processing-released-{time()}",
+                }
+            ]
 
-            if ts._has_lost_dependencies:
-                recommendations[key] = "forgotten"
-            elif ts._waiters or ts._who_wants:
-                recommendations[key] = "waiting"
+        ts.state = "released"
 
-            if recommendations.get(key) != "waiting":
-                for dts in ts._dependencies:
-                    if dts._state != "released":
-                        dts._waiters.discard(ts)
-                        if not dts._waiters and not dts._who_wants:
-                            recommendations[dts._key] = "released"
-                ts._waiters.clear()
+        if ts._has_lost_dependencies:
+            recommendations[key] = "forgotten"
+        elif ts._waiters or ts._who_wants:
+            recommendations[key] = "waiting"
 
-            if self._validate:
-                assert not ts._processing_on
+        if recommendations.get(key) != "waiting":
+            for dts in ts._dependencies:
+                if dts._state != "released":
+                    dts._waiters.discard(ts)
+                    if not dts._waiters and not dts._who_wants:
+                        recommendations[dts._key] = "released"
+            ts._waiters.clear()
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        if self._validate:
+            assert not ts._processing_on
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_processing_erred(
         self,
         key: str,
@@ -3170,205 +3173,188 @@ class SchedulerState:
         **kwargs,
     ):
         ws: WorkerState
-        try:
-            ts: TaskState = self._tasks[key]
-            dts: TaskState
-            failing_ts: TaskState
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert cause or ts._exception_blame
-                assert ts._processing_on
-                assert not ts._who_has
-                assert not ts._waiting_on
+        ts: TaskState = self._tasks[key]
+        dts: TaskState
+        failing_ts: TaskState
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            if ts._actor:
-                ws = ts._processing_on
-                ws._actors.remove(ts)
-
-            w = _remove_from_processing(self, ts)
-
-            ts._erred_on.add(w or worker)
-            if exception is not None:
-                ts._exception = exception
-                ts._exception_text = exception_text  # type: ignore
-            if traceback is not None:
-                ts._traceback = traceback
-                ts._traceback_text = traceback_text  # type: ignore
-            if cause is not None:
-                failing_ts = self._tasks[cause]
-                ts._exception_blame = failing_ts
-            else:
-                failing_ts = ts._exception_blame  # type: ignore
+        if self._validate:
+            assert cause or ts._exception_blame
+            assert ts._processing_on
+            assert not ts._who_has
+            assert not ts._waiting_on
 
-            for dts in ts._dependents:
-                dts._exception_blame = failing_ts
-                recommendations[dts._key] = "erred"
+        if ts._actor:
+            ws = ts._processing_on
+            ws._actors.remove(ts)
+
+        w = _remove_from_processing(self, ts)
+
+        if ts._erred_on is None:
+            ts._erred_on = set()
+        ts._erred_on.add(w or worker)
+        if exception is not None:
+            ts._exception = exception
+            ts._exception_text = exception_text  # type: ignore
+        if traceback is not None:
+            ts._traceback = traceback
+            ts._traceback_text = traceback_text  # type: ignore
+        if cause is not None:
+            failing_ts = self._tasks[cause]
+            ts._exception_blame = failing_ts
+        else:
+            failing_ts = ts._exception_blame  # type: ignore
 
-            for dts in ts._dependencies:
-                dts._waiters.discard(ts)
-                if not dts._waiters and not dts._who_wants:
-                    recommendations[dts._key] = "released"
+        for dts in ts._dependents:
+            dts._exception_blame = failing_ts
+            recommendations[dts._key] = "erred"
 
-            ts._waiters.clear()  # do anything with this?
+        for dts in ts._dependencies:
+            dts._waiters.discard(ts)
+            if not dts._waiters and not dts._who_wants:
+                recommendations[dts._key] = "released"
 
-            ts.state = "erred"
+        ts._waiters.clear()  # do anything with this?
 
-            report_msg = {
-                "op": "task-erred",
-                "key": key,
-                "exception": failing_ts._exception,
-                "traceback": failing_ts._traceback,
-            }
-            cs: ClientState
-            for cs in ts._who_wants:
-                client_msgs[cs._client_key] = [report_msg]
+        ts.state = "erred"
 
-            cs = self._clients["fire-and-forget"]
-            if ts in cs._wants_what:
-                _client_releases_keys(
-                    self,
-                    cs=cs,
-                    keys=[key],
-                    recommendations=recommendations,
-                )
+        report_msg = {
+            "op": "task-erred",
+            "key": key,
+            "exception": failing_ts._exception,
+            "traceback": failing_ts._traceback,
+        }
+        cs: ClientState
+        for cs in ts._who_wants:
+            client_msgs[cs._client_key] = [report_msg]
 
-            if self._validate:
-                assert not ts._processing_on
+        cs = self._fire_and_forget
+        if cs._wants_what and ts in cs._wants_what:
+            _client_releases_keys(
+                self,
+                cs=cs,
+                keys=[key],
+                recommendations=recommendations,
+            )
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        if self._validate:
+            assert not ts._processing_on
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_no_worker_released(self, key):
-        try:
-            ts: TaskState = self._tasks[key]
-            dts: TaskState
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert self._tasks[key].state == "no-worker"
-                assert not ts._who_has
-                assert not ts._waiting_on
+        ts: TaskState = self._tasks[key]
+        dts: TaskState
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            self._unrunnable.remove(ts)
-            ts.state = "released"
+        if self._validate:
+            assert self._tasks[key].state == "no-worker"
+            assert not ts._who_has
+            assert not ts._waiting_on
 
-            for dts in ts._dependencies:
-                dts._waiters.discard(ts)
+        self._unrunnable.remove(ts)
+        ts.state = "released"
 
-            ts._waiters.clear()
+        for dts in ts._dependencies:
+            dts._waiters.discard(ts)
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        ts._waiters.clear()
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
     @ccall
     def remove_key(self, key):
         ts: TaskState = self._tasks.pop(key)
         assert ts._state == "forgotten"
         self._unrunnable.discard(ts)
+        if ts._nbytes >= 0:
+            ts._prefix._nbytes_known -= ts._nbytes
+            ts._prefix._n_nbytes_known -= 1
         cs: ClientState
-        for cs in ts._who_wants:
-            cs._wants_what.remove(ts)
-        ts._who_wants.clear()
+        who_wants: set = ts._who_wants
+        if who_wants:
+            # Most tasks are wanted by a single client; avoid setting up a loop
+            if len(who_wants) == 1:
+                cs = next(iter(who_wants))
+                cs._wants_what.discard(ts)
+            else:
+                for cs in who_wants:
+                    cs._wants_what.discard(ts)
+            who_wants.clear()
         ts._processing_on = None
         ts._exception_blame = ts._exception = ts._traceback = None
         self._task_metadata.pop(key, None)
 
+    @_log_transition_errors
     def transition_memory_forgotten(self, key):
         ws: WorkerState
-        try:
-            ts: TaskState = self._tasks[key]
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
-
-            if self._validate:
-                assert ts._state == "memory"
-                assert not ts._processing_on
-                assert not ts._waiting_on
-                if not ts._run_spec:
-                    # It's ok to forget a pure data task
-                    pass
-                elif ts._has_lost_dependencies:
-                    # It's ok to forget a task with forgotten dependencies
-                    pass
-                elif not ts._who_wants and not ts._waiters and not ts._dependents:
-                    # It's ok to forget a task that nobody needs
-                    pass
-                else:
-                    assert 0, (ts,)
+        ts: TaskState = self._tasks[key]
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            if ts._actor:
-                for ws in ts._who_has:
-                    ws._actors.discard(ts)
+        if self._validate:
+            assert ts._state == "memory"
+            assert not ts._processing_on
+            assert not ts._waiting_on
+            if not ts._run_spec:
+                # It's ok to forget a pure data task
+                pass
+            elif ts._has_lost_dependencies:
+                # It's ok to forget a task with forgotten dependencies
+                pass
+            elif not ts._who_wants and not ts._waiters and not ts._dependents:
+                # It's ok to forget a task that nobody needs
+                pass
+            else:
+                assert 0, (ts,)
 
-            _propagate_forgotten(self, ts, recommendations, worker_msgs)
+        if ts._actor:
+            for ws in ts._who_has:
+                ws._actors.discard(ts)
 
-            client_msgs = _task_to_client_msgs(self, ts)
-            self.remove_key(key)
+        _propagate_forgotten(self, ts, recommendations, worker_msgs)
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
+        client_msgs = _task_to_client_msgs(self, ts)
+        self.remove_key(key)
 
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
+    @_log_transition_errors
     def transition_released_forgotten(self, key):
-        try:
-            ts: TaskState = self._tasks[key]
-            recommendations: dict = {}
-            client_msgs: dict = {}
-            worker_msgs: dict = {}
+        ts: TaskState = self._tasks[key]
+        recommendations: dict = {}
+        client_msgs: dict = {}
+        worker_msgs: dict = {}
 
-            if self._validate:
-                assert ts._state in ("released", "erred")
-                assert not ts._who_has
-                assert not ts._processing_on
-                assert not ts._waiting_on, (ts, ts._waiting_on)
-                if not ts._run_spec:
-                    # It's ok to forget a pure data task
-                    pass
-                elif ts._has_lost_dependencies:
-                    # It's ok to forget a task with forgotten dependencies
-                    pass
-                elif not ts._who_wants and not ts._waiters and not ts._dependents:
-                    # It's ok to forget a task that nobody needs
-                    pass
-                else:
-                    assert 0, (ts,)
+        if self._validate:
+            assert ts._state in ("released", "erred")
+            assert not ts._who_has
+            assert not ts._processing_on
+            assert not ts._waiting_on, (ts, ts._waiting_on)
+            if not ts._run_spec:
+                # It's ok to forget a pure data task
+                pass
+            elif ts._has_lost_dependencies:
+                # It's ok to forget a task with forgotten dependencies
+                pass
+            elif not ts._who_wants and not ts._waiters and not ts._dependents:
+                # It's ok to forget a task that nobody needs
+                pass
+            else:
+                assert 0, (ts,)
 
-            _propagate_forgotten(self, ts, recommendations, worker_msgs)
+        _propagate_forgotten(self, ts, recommendations, worker_msgs)
 
-            client_msgs = _task_to_client_msgs(self, ts)
-            self.remove_key(key)
+        client_msgs = _task_to_client_msgs(self, ts)
+        self.remove_key(key)
 
-            return recommendations, client_msgs, worker_msgs
-        except Exception as e:
-            logger.exception(e)
-            if LOG_PDB:
-                import pdb
-
-                pdb.set_trace()
-            raise
+        return recommendations, client_msgs, worker_msgs
 
     ##############################
     # Assigning Tasks to Workers #
@@ -3512,6 +3498,39 @@ class SchedulerState:
 
         return s
 
+    @ccall
+    @exceptval(check=False)
+    def worker_is_valid(self, ts: TaskState, ws: WorkerState) -> bint:
+        """Whether *ws* is one of the ``valid_workers`` of *ts*
+
+        This checks the restrictions of *ts* against a single worker, without
+        building the set of all valid workers.
+        """
+        if ws not in self._running:
+            return False
+
+        if ts._worker_restrictions or ts._host_restrictions:
+            if ws._address not in ts._worker_restrictions:
+                if not ts._host_restrictions:
+                    return False
+                host = ws.host
+                for h in ts._host_restrictions:
+                    if self.coerce_hostname(h) == host:
+                        break
+                else:
+                    return False
+
+        if ts._resource_restrictions:
+            for resource, required in ts._resource_restrictions.items():
+                dr: dict = self._resources.get(resource)  # type: ignore
+                if dr is None:
+                    return False
+                supplied = dr.get(ws._address)
+                if supplied is None or supplied < required:
+                    return False
+
+        return True
+
     @ccall
     def consume_resources(self, ts: TaskState, ws: WorkerState):
         if ts._resource_restrictions:
@@ -3572,6 +3591,32 @@ class SchedulerState:
         ts._who_has.add(ws)
         if len(ts._who_has) == 2:
             self._replicated_tasks.add(ts)
+            if self._retiring:
+                self._wake_retiring(ts)
+
+    @ccall
+    def add_replicas(self, tss: list, ws: WorkerState):
+        """Note that a worker holds replicas of several tasks with state='memory'
+
+        Equivalent to calling :meth:`add_replica` for each task.
+        """
+        ts: TaskState
+        has_what: dict = ws._has_what
+        replicated_tasks: set = self._replicated_tasks
+        nbytes: Py_ssize_t = 0
+        for ts in tss:
+            if self._validate:
+                assert ws not in ts._who_has
+                assert ts not in has_what
+
+            nbytes += ts.get_nbytes()
+            has_what[ts] = None
+            ts._who_has.add(ws)
+            if len(ts._who_has) == 2:
+                replicated_tasks.add(ts)
+                if self._retiring:
+                    self._wake_retiring(ts)
+        ws._nbytes += nbytes
 
     @ccall
     def remove_replica(self, ts: TaskState, ws: WorkerState):
@@ -3581,12 +3626,36 @@ class SchedulerState:
         ts._who_has.remove(ws)
         if len(ts._who_has) == 1:
             self._replicated_tasks.remove(ts)
+        if self._retiring and ws in self._retiring:
+            self._retiring[ws].set()
+
+    @ccall
+    def remove_replicas(self, tss: list, ws: WorkerState):
+        """Note that a worker no longer holds replicas of several tasks
+
+        Equivalent to calling :meth:`remove_replica` for each task.
+        """
+        ts: TaskState
+        has_what: dict = ws._has_what
+        replicated_tasks: set = self._replicated_tasks
+        nbytes: Py_ssize_t = 0
+        for ts in tss:
+            nbytes += ts.get_nbytes()
+            del has_what[ts]
+            ts._who_has.remove(ws)
+            if len(ts._who_has) == 1:
+                replicated_tasks.remove(ts)
+        ws._nbytes -= nbytes
+        if self._retiring and ws in self._retiring:
+            self._retiring[ws].set()
 
     @ccall
     def remove_all_replicas(self, ts: TaskState):
         """Remove all replicas of a task from all workers"""
         ws: WorkerState
         nbytes: Py_ssize_t = ts.get_nbytes()
+        if self._retiring:
+            self._wake_retiring(ts)
         for ws in ts._who_has:
             ws._nbytes -= nbytes
             del ws._has_what[ts]
@@ -3594,22 +3663,48 @@ class SchedulerState:
             self._replicated_tasks.remove(ts)
         ts._who_has.clear()
 
+    @cfunc
+    @exceptval(check=False)
+    def _wake_retiring(self, ts: TaskState):
+        """Wake up the retirement of any worker holding a replica of a task"""
+        ws: WorkerState
+        for ws in ts._who_has:
+            event = self._retiring.get(ws)
+            if event is not None:
+                event.set()
+
     @ccall
     @exceptval(check=False)
     def _reevaluate_occupancy_worker(self, ws: WorkerState):
         """See reevaluate_occupancy"""
         ts: TaskState
-        old = ws._occupancy
+        old: double = ws._occupancy
         for ts in ws._processing:
             self.set_duration_estimate(ts, ws)
 
         self.check_idle_saturated(ws)
-        steal = self.extensions.get("stealing")
-        if steal is None:
-            return
-        if ws._occupancy > old * 1.3 or old > ws._occupancy * 1.3:
-            for ts in ws._processing:
-                steal.recalculate_cost(ts)
+        new: double = ws._occupancy
+        if new > old * 1.3 or old > new * 1.3:
+            steal = self._stealing_ext
+            if steal is not None:
+                for ts in ws._processing:
+                    steal.recalculate_cost(ts)
+
+
+class _EventLog(dict):
+    """``{topic: deque}`` of the most recent events, creating bounded deques for
+    new topics on first access
+    """
+
+    __slots__ = ("maxlen",)
+
+    def __init__(self, maxlen: int):
+        super().__init__()
+        self.maxlen = maxlen
+
+    def __missing__(self, topic) -> deque:
+        self[topic] = events = deque(maxlen=self.maxlen)
+        return events
 
 
 class Scheduler(SchedulerState, ServerNode):
@@ -3685,6 +3780,191 @@ class Scheduler(SchedulerState, ServerNode):
     default_port = 8786
     _instances: "ClassVar[weakref.WeakSet[Scheduler]]" = weakref.WeakSet()
 
+    # (op, method name) pairs, resolved to bound methods by __init__
+    _RPC_HANDLERS: "ClassVar[tuple[tuple[str, str], ...]]" = (
+        ("register-client", "add_client"),
+        ("scatter", "scatter"),
+        ("register-worker", "add_worker"),
+        ("register_nanny", "add_nanny"),
+        ("unregister", "remove_worker"),
+        ("gather", "gather"),
+        ("cancel", "stimulus_cancel"),
+        ("retry", "stimulus_retry"),
+        ("feed", "feed"),
+        ("terminate", "close"),
+        ("broadcast", "broadcast"),
+        ("proxy", "proxy"),
+        ("ncores", "get_ncores"),
+        ("ncores_running", "get_ncores_running"),
+        ("has_what", "get_has_what"),
+        ("who_has", "get_who_has"),
+        ("processing", "get_processing"),
+        ("call_stack", "get_call_stack"),
+        ("profile", "get_profile"),
+        ("performance_report", "performance_report"),
+        ("get_logs", "get_logs"),
+        ("logs", "get_logs"),
+        ("worker_logs", "get_worker_logs"),
+        ("log_event", "log_worker_event"),
+        ("events", "get_events"),
+        ("nbytes", "get_nbytes"),
+        ("versions", "versions"),
+        ("add_keys", "add_keys"),
+        ("rebalance", "rebalance"),
+        ("replicate", "replicate"),
+        ("start_ipython", "start_ipython"),
+        ("run_function", "run_function"),
+        ("update_data", "update_data"),
+        ("set_resources", "add_resources"),
+        ("retire_workers", "retire_workers"),
+        ("get_metadata", "get_metadata"),
+        ("set_metadata", "set_metadata"),
+        ("set_restrictions", "set_restrictions"),
+        ("heartbeat_worker", "heartbeat_worker"),
+        ("get_task_status", "get_task_status"),
+        ("get_task_stream", "get_task_stream"),
+        ("get_task_prefix_states", "get_task_prefix_states"),
+        ("register_scheduler_plugin", "register_scheduler_plugin"),
+        ("register_worker_plugin", "register_worker_plugin"),
+        ("unregister_worker_plugin", "unregister_worker_plugin"),
+        ("register_nanny_plugin", "register_nanny_plugin"),
+        ("unregister_nanny_plugin", "unregister_nanny_plugin"),
+        ("adaptive_target", "adaptive_target"),
+        ("workers_to_close", "workers_to_close"),
+        ("subscribe_worker_status", "subscribe_worker_status"),
+        ("start_task_metadata", "start_task_metadata"),
+        ("stop_task_metadata", "stop_task_metadata"),
+        ("get_cluster_state", "get_cluster_state"),
+        ("dump_cluster_state_to_url", "dump_cluster_state_to_url"),
+        ("benchmark_hardware", "benchmark_hardware"),
+    )
+    _WORKER_HANDLERS: "ClassVar[tuple[tuple[str, str], ...]]" = (
+        ("task-finished", "handle_task_finished"),
+        ("task-erred", "handle_task_erred"),
+        ("release-worker-data", "release_worker_data"),
+        ("add-keys", "add_keys"),
+        ("missing-data", "handle_missing_data"),
+        ("long-running", "handle_long_running"),
+        ("reschedule", "reschedule"),
+        ("keep-alive", "_noop"),
+        ("log-event", "log_worker_event"),
+        ("worker-status-change", "handle_worker_status_change"),
+    )
+    _CLIENT_HANDLERS: "ClassVar[tuple[tuple[str, str], ...]]" = (
+        ("update-graph", "update_graph"),
+        ("update-graph-hlg", "update_graph_hlg"),
+        ("client-desires-keys", "client_desires_keys"),
+        ("update-data", "update_data"),
+        ("report-key", "report_on_key"),
+        ("client-releases-keys", "client_releases_keys"),
+        ("heartbeat-client", "client_heartbeat"),
+        ("close-client", "remove_client"),
+        ("restart", "restart"),
+        ("subscribe-topic", "subscribe_topic"),
+        ("unsubscribe-topic", "unsubscribe_topic"),
+    )
+
+    # Mappings mimicking the former Scheduler state dictionaries. They are only
+    # built, by __getattr__, the first time they are accessed.
+    # {legacy attribute: (mapping type, state collection, state attribute, wrap)}
+    _LEGACY_MAPPINGS: "ClassVar[dict[str, tuple]]" = {
+        # Task state
+        "priority": (_StateLegacyMapping, "tasks", "priority", None),
+        "dependencies": (
+            _StateLegacyMapping,
+            "tasks",
+            "dependencies",
+            _legacy_task_key_set,
+        ),
+        "dependents": (
+            _StateLegacyMapping,
+            "tasks",
+            "dependents",
+            _legacy_task_key_set,
+        ),
+        "retries": (_StateLegacyMapping, "tasks", "retries", None),
+        "nbytes": (_OptionalStateLegacyMapping, "tasks", "nbytes", None),
+        "who_wants": (
+            _OptionalStateLegacyMapping,
+            "tasks",
+            "who_wants",
+            _legacy_client_key_set,
+        ),
+        "who_has": (
+            _OptionalStateLegacyMapping,
+            "tasks",
+            "who_has",
+            _legacy_worker_key_set,
+        ),
+        "waiting": (
+            _OptionalStateLegacyMapping,
+            "tasks",
+            "waiting_on",
+            _legacy_task_key_set,
+        ),
+        "waiting_data": (
+            _OptionalStateLegacyMapping,
+            "tasks",
+            "waiters",
+            _legacy_task_key_set,
+        ),
+        "rprocessing": (_OptionalStateLegacyMapping, "tasks", "processing_on", None),
+        "host_restrictions": (
+            _OptionalStateLegacyMapping,
+            "tasks",
+            "host_restrictions",
+            None,
+        ),
+        "worker_restrictions": (
+            _OptionalStateLegacyMapping,
+            "tasks",
+            "worker_restrictions",
+            None,
+        ),
+        "resource_restrictions": (
+            _OptionalStateLegacyMapping,
+            "tasks",
+            "resource_restrictions",
+            None,
+        ),
+        "suspicious_tasks": (_OptionalStateLegacyMapping, "tasks", "suspicious", None),
+        "exceptions": (_OptionalStateLegacyMapping, "tasks", "exception", None),
+        "tracebacks": (_OptionalStateLegacyMapping, "tasks", "traceback", None),
+        "exceptions_blame": (
+            _OptionalStateLegacyMapping,
+            "tasks",
+            "exception_blame",
+            _task_key_or_none,
+        ),
+        "loose_restrictions": (_StateLegacySet, "tasks", "loose_restrictions", None),
+        # Client state
+        "wants_what": (
+            _StateLegacyMapping,
+            "clients",
+            "wants_what",
+            _legacy_task_key_set,
+        ),
+        # Worker state
+        "nthreads": (_StateLegacyMapping, "workers", "nthreads", None),
+        "worker_bytes": (_StateLegacyMapping, "workers", "nbytes", None),
+        "worker_resources": (_StateLegacyMapping, "workers", "resources", None),
+        "used_resources": (_StateLegacyMapping, "workers", "used_resources", None),
+        "occupancy": (_StateLegacyMapping, "workers", "occupancy", None),
+        "worker_info": (_StateLegacyMapping, "workers", "metrics", None),
+        "processing": (
+            _StateLegacyMapping,
+            "workers",
+            "processing",
+            _legacy_task_key_dict,
+        ),
+        "has_what": (
+            _StateLegacyMapping,
+            "workers",
+            "has_what",
+            _legacy_task_key_set,
+        ),
+    }
+
     def __init__(
         self,
         loop=None,
@@ -3720,6 +4000,8 @@ class Scheduler(SchedulerState, ServerNode):
         if validate is None:
             validate = dask.config.get("distributed.scheduler.validate")
         self.proc = psutil.Process()
+        # (cpu_percent, time) of the last sample taken by reevaluate_occupancy
+        self._cpu_percent_sample = (0.0, 0.0)
         self.delete_interval = parse_timedelta(delete_interval, default="ms")
         self.synchronize_worker_interval = parse_timedelta(
             synchronize_worker_interval, default="ms"
@@ -3792,47 +4074,21 @@ class Scheduler(SchedulerState, ServerNode):
         self.stream_comms = {}
         self._worker_coroutines = []
         self._ipython_kernel = None
+        # Set by close(close_workers=True) while waiting for workers to leave
+        self._workers_removed = None
+        # Set by restart() while waiting for the old number of workers to return,
+        # as (number of workers, event set by add_worker)
+        self._workers_restored = None
+        # str(name) -> addresses of the workers with that name, so that names passed
+        # through a CLI can be resolved without stringifying every worker's name
+        self._addresses_by_name_str = {}
 
         # Task state
         tasks = {}
-        for old_attr, new_attr, wrap in [
-            ("priority", "priority", None),
-            ("dependencies", "dependencies", _legacy_task_key_set),
-            ("dependents", "dependents", _legacy_task_key_set),
-            ("retries", "retries", None),
-        ]:
-            func = operator.attrgetter(new_attr)
-            if wrap is not None:
-                func = compose(wrap, func)
-            setattr(self, old_attr, _StateLegacyMapping(tasks, func))
-
-        for old_attr, new_attr, wrap in [
-            ("nbytes", "nbytes", None),
-            ("who_wants", "who_wants", _legacy_client_key_set),
-            ("who_has", "who_has", _legacy_worker_key_set),
-            ("waiting", "waiting_on", _legacy_task_key_set),
-            ("waiting_data", "waiters", _legacy_task_key_set),
-            ("rprocessing", "processing_on", None),
-            ("host_restrictions", "host_restrictions", None),
-            ("worker_restrictions", "worker_restrictions", None),
-            ("resource_restrictions", "resource_restrictions", None),
-            ("suspicious_tasks", "suspicious", None),
-            ("exceptions", "exception", None),
-            ("tracebacks", "traceback", None),
-            ("exceptions_blame", "exception_blame", _task_key_or_none),
-        ]:
-            func = operator.attrgetter(new_attr)
-            if wrap is not None:
-                func = compose(wrap, func)
-            setattr(self, old_attr, _OptionalStateLegacyMapping(tasks, func))
-
-        for old_attr, new_attr, wrap in [
-            ("loose_restrictions", "loose_restrictions", None)
-        ]:
-            func = operator.attrgetter(new_attr)
-            if wrap is not None:
-                func = compose(wrap, func)
-            setattr(self, old_attr, _StateLegacySet(tasks, func))
+        self._state_validators = {
+            state: getattr(self, "validate_" + state.replace("-", "_"))
+            for state in ALL_TASK_STATES
+        }
 
         self.generation = 0
         self._last_client = None
@@ -3845,30 +4101,9 @@ class Scheduler(SchedulerState, ServerNode):
 
         # Client state
         clients = {}
-        for old_attr, new_attr, wrap in [
-            ("wants_what", "wants_what", _legacy_task_key_set)
-        ]:
-            func = operator.attrgetter(new_attr)
-            if wrap is not None:
-                func = compose(wrap, func)
-            setattr(self, old_attr, _StateLegacyMapping(clients, func))
 
         # Worker state
         workers = SortedDict()
-        for old_attr, new_attr, wrap in [
-            ("nthreads", "nthreads", None),
-            ("worker_bytes", "nbytes", None),
-            ("worker_resources", "resources", None),
-            ("used_resources", "used_resources", None),
-            ("occupancy", "occupancy", None),
-            ("worker_info", "metrics", None),
-            ("processing", "processing", _legacy_task_key_dict),
-            ("has_what", "has_what", _legacy_task_key_set),
-        ]:
-            func = operator.attrgetter(new_attr)
-            if wrap is not None:
-                func = compose(wrap, func)
-            setattr(self, old_attr, _StateLegacyMapping(workers, func))
 
         host_info = {}
         resources = {}
@@ -3889,102 +4124,37 @@ class Scheduler(SchedulerState, ServerNode):
         self.log = deque(
             maxlen=dask.config.get("distributed.scheduler.transition-log-length")
         )
-        self.events = defaultdict(
-            partial(
-                deque, maxlen=dask.config.get("distributed.scheduler.events-log-length")
-            )
+        self.events = _EventLog(
+            dask.config.get("distributed.scheduler.events-log-length")
         )
         self.event_counts = defaultdict(int)
         self.event_subscriber = defaultdict(set)
+        # {worker address or client id: time after which its events are dropped}
+        self._events_pending_cleanup = {}
+        self._events_cleanup_delay = parse_timedelta(
+            dask.config.get("distributed.scheduler.events-cleanup-delay")
+        )
         self.worker_plugins = {}
         self.nanny_plugins = {}
-
+        # {worker address or client id: versions}, kept in sync by add_worker,
+        # remove_worker, add_client and remove_client
+        self._versions_snapshot = {}
+        # Our own package versions, collected on first use by _get_own_versions
+        self._own_versions = None
+        # {client packages: version warning}, cleared whenever workers come or go
+        self._client_version_warnings = {}
+        # heartbeat_interval(len(workers)), refreshed by add_worker and remove_worker
+        self._heartbeat_interval = heartbeat_interval(0)
+
+        self.handlers = {op: getattr(self, name) for op, name in self._RPC_HANDLERS}
         worker_handlers = {
-            "task-finished": self.handle_task_finished,
-            "task-erred": self.handle_task_erred,
-            "release-worker-data": self.release_worker_data,
-            "add-keys": self.add_keys,
-            "missing-data": self.handle_missing_data,
-            "long-running": self.handle_long_running,
-            "reschedule": self.reschedule,
-            "keep-alive": lambda *args, **kwargs: None,
-            "log-event": self.log_worker_event,
-            "worker-status-change": self.handle_worker_status_change,
+            op: getattr(self, name) for op, name in self._WORKER_HANDLERS
         }
-
         client_handlers = {
-            "update-graph": self.update_graph,
-            "update-graph-hlg": self.update_graph_hlg,
-            "client-desires-keys": self.client_desires_keys,
-            "update-data": self.update_data,
-            "report-key": self.report_on_key,
-            "client-releases-keys": self.client_releases_keys,
-            "heartbeat-client": self.client_heartbeat,
-            "close-client": self.remove_client,
-            "restart": self.restart,
-            "subscribe-topic": self.subscribe_topic,
-            "unsubscribe-topic": self.unsubscribe_topic,
+            op: getattr(self, name) for op, name in self._CLIENT_HANDLERS
         }
 
-        self.handlers = {
-            "register-client": self.add_client,
-            "scatter": self.scatter,
-            "register-worker": self.add_worker,
-            "register_nanny": self.add_nanny,
-            "unregister": self.remove_worker,
-            "gather": self.gather,
-            "cancel": self.stimulus_cancel,
-            "retry": self.stimulus_retry,
-            "feed": self.feed,
-            "terminate": self.close,
-            "broadcast": self.broadcast,
-            "proxy": self.proxy,
-            "ncores": self.get_ncores,
-            "ncores_running": self.get_ncores_running,
-            "has_what": self.get_has_what,
-            "who_has": self.get_who_has,
-            "processing": self.get_processing,
-            "call_stack": self.get_call_stack,
-            "profile": self.get_profile,
-            "performance_report": self.performance_report,
-            "get_logs": self.get_logs,
-            "logs": self.get_logs,
-            "worker_logs": self.get_worker_logs,
-            "log_event": self.log_worker_event,
-            "events": self.get_events,
-            "nbytes": self.get_nbytes,
-            "versions": self.versions,
-            "add_keys": self.add_keys,
-            "rebalance": self.rebalance,
-            "replicate": self.replicate,
-            "start_ipython": self.start_ipython,
-            "run_function": self.run_function,
-            "update_data": self.update_data,
-            "set_resources": self.add_resources,
-            "retire_workers": self.retire_workers,
-            "get_metadata": self.get_metadata,
-            "set_metadata": self.set_metadata,
-            "set_restrictions": self.set_restrictions,
-            "heartbeat_worker": self.heartbeat_worker,
-            "get_task_status": self.get_task_status,
-            "get_task_stream": self.get_task_stream,
-            "get_task_prefix_states": self.get_task_prefix_states,
-            "register_scheduler_plugin": self.register_scheduler_plugin,
-            "register_worker_plugin": self.register_worker_plugin,
-            "unregister_worker_plugin": self.unregister_worker_plugin,
-            "register_nanny_plugin": self.register_nanny_plugin,
-            "unregister_nanny_plugin": self.unregister_nanny_plugin,
-            "adaptive_target": self.adaptive_target,
-            "workers_to_close": self.workers_to_close,
-            "subscribe_worker_status": self.subscribe_worker_status,
-            "start_task_metadata": self.start_task_metadata,
-            "stop_task_metadata": self.stop_task_metadata,
-            "get_cluster_state": self.get_cluster_state,
-            "dump_cluster_state_to_url": self.dump_cluster_state_to_url,
-            "benchmark_hardware": self.benchmark_hardware,
-        }
-
-        connection_limit = get_fileno_limit() / 2
+        connection_limit = get_fileno_limit() // 2
 
         super().__init__(
             # Arguments to SchedulerState
@@ -4015,6 +4185,11 @@ class Scheduler(SchedulerState, ServerNode):
             pc = PeriodicCallback(self.check_idle, self.idle_timeout * 1000 / 4)
             self.periodic_callbacks["idle-timeout"] = pc
 
+        pc = PeriodicCallback(
+            self._clear_events, max(self._events_cleanup_delay * 1000, 10)
+        )
+        self.periodic_callbacks["events-cleanup"] = pc
+
         if extensions is None:
             extensions = DEFAULT_EXTENSIONS.copy()
             if not dask.config.get("distributed.scheduler.work-stealing"):
@@ -4023,12 +4198,32 @@ class Scheduler(SchedulerState, ServerNode):
 
         for name, extension in extensions.items():
             self.extensions[name] = extension(self)
+        self._stealing_ext = self.extensions.get("stealing")
 
         setproctitle("dask-scheduler [not started]")
         Scheduler._instances.add(self)
         self.rpc.allow_offload = False
         self.status = Status.undefined
 
+    @staticmethod
+    def _noop(*args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        try:
+            mapping_type, states, attr, wrap = Scheduler._LEGACY_MAPPINGS[name]
+        except KeyError:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            ) from None
+        func = operator.attrgetter(attr)
+        if wrap is not None:
+            func = compose(wrap, func)
+        mapping = mapping_type(getattr(self, states), func)
+        # Cache on the instance so that __getattr__ is not called again
+        setattr(self, name, mapping)
+        return mapping
+
     ##################
     # Administration #
     ##################
@@ -4051,19 +4246,57 @@ class Scheduler(SchedulerState, ServerNode):
             tasks=parent._tasks,
         )
 
-    def identity(self):
-        """Basic information about ourselves and our cluster"""
+    def _get_own_versions(self) -> dict:
+        """Package versions of the scheduler process, computed only once"""
+        if self._own_versions is None:
+            self._own_versions = version_module.get_versions()
+        return self._own_versions
+
+    def _get_client_version_warning(self, versions: dict) -> dict:
+        """Version mismatch warning for a client, shared by clients with the
+        same packages as long as the set of workers doesn't change
+        """
         parent: SchedulerState = cast(SchedulerState, self)
+        packages = versions.get("packages") if versions else None
+        try:
+            cache_key = frozenset(packages.items()) if packages else None
+            return self._client_version_warnings[cache_key]
+        except TypeError:  # unhashable package versions
+            cache_key = None
+        except KeyError:
+            pass
+
+        ws: WorkerState
+        warning = version_module.error_message(
+            self._get_own_versions(),
+            {w: ws._versions for w, ws in parent._workers_dv.items()},
+            versions,
+        )
+        if cache_key is not None:
+            self._client_version_warnings[cache_key] = warning
+        return warning
+
+    def identity(self, n_workers: int = -1):
+        """Basic information about ourselves and our cluster
+
+        Parameters
+        ----------
+        n_workers : int, optional
+            Only describe the first ``n_workers`` workers. By default all workers
+            are included, which can be expensive on large clusters.
+        """
+        parent: SchedulerState = cast(SchedulerState, self)
+        ws: WorkerState
+        workers = parent._workers_dv.values()
+        if n_workers >= 0 and n_workers < len(parent._workers_dv):
+            workers = itertools.islice(workers, n_workers)
         d = {
             "type": type(self).__name__,
             "id": str(self.id),
             "address": self.address,
             "services": {key: v.port for (key, v) in self.services.items()},
             "started": self.time_started,
-            "workers": {
-                worker.address: worker.identity()
-                for worker in parent._workers_dv.values()
-            },
+            "workers": {ws._address: ws.identity() for ws in workers},
         }
         return d
 
@@ -4173,6 +4406,7 @@ class Scheduler(SchedulerState, ServerNode):
 
     async def start(self):
         """Clear out old state and restart all running coroutines"""
+        parent: SchedulerState = cast(SchedulerState, self)
         await super().start()
         assert self.status != Status.running
 
@@ -4225,9 +4459,7 @@ class Scheduler(SchedulerState, ServerNode):
         for preload in self.preloads:
             await preload.start()
 
-        await asyncio.gather(
-            *[plugin.start(self) for plugin in list(self.plugins.values())]
-        )
+        await asyncio.gather(*[plugin.start(self) for plugin in parent._plugins_tuple])
 
         self.start_periodic_callbacks()
 
@@ -4247,7 +4479,7 @@ class Scheduler(SchedulerState, ServerNode):
             return
 
         await asyncio.gather(
-            *[plugin.before_close() for plugin in list(self.plugins.values())]
+            *[plugin.before_close() for plugin in parent._plugins_tuple]
         )
 
         self.status = Status.closing
@@ -4260,20 +4492,24 @@ class Scheduler(SchedulerState, ServerNode):
 
         if close_workers:
             await self.broadcast(msg={"op": "close_gracefully"}, nanny=True)
+            # Report would require the worker to unregister with the
+            # currently closing scheduler. This is not necessary and might
+            # delay shutdown of the worker unnecessarily
+            msg = {"op": "close", "report": False}
+            stream_comms: dict = self.stream_comms
             for worker in parent._workers_dv:
-                # Report would require the worker to unregister with the
-                # currently closing scheduler. This is not necessary and might
-                # delay shutdown of the worker unnecessarily
-                self.worker_send(worker, {"op": "close", "report": False})
-            for i in range(20):  # wait a second for send signals to clear
-                if parent._workers_dv:
-                    await asyncio.sleep(0.05)
-                else:
-                    break
-
-        await asyncio.gather(
-            *[plugin.close() for plugin in list(self.plugins.values())]
-        )
+                bcomm = stream_comms.get(worker)
+                if bcomm is not None:
+                    with suppress(CommClosedError):
+                        bcomm.send(msg)
+            if parent._workers_dv:
+                # wait a second for send signals to clear; set by remove_worker
+                self._workers_removed = asyncio.Event()
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._workers_removed.wait(), timeout=1)
+                self._workers_removed = None
+
+        await asyncio.gather(*[plugin.close() for plugin in parent._plugins_tuple])
 
         for pc in self.periodic_callbacks.values():
             pc.stop()
@@ -4287,15 +4523,18 @@ class Scheduler(SchedulerState, ServerNode):
         logger.info("Scheduler closing all comms")
 
         futures = []
-        for w, comm in list(self.stream_comms.items()):
+        for comm in self.stream_comms.values():
             if not comm.closed():
                 comm.send({"op": "close", "report": False})
                 comm.send({"op": "close-stream"})
             with suppress(AttributeError):
                 futures.append(comm.close())
 
-        for future in futures:  # TODO: do all at once
-            await future
+        if futures:
+            results = await asyncio.gather(*futures, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    logger.error("Failed to close worker stream", exc_info=result)
 
         for comm in self.client_comms.values():
             comm.abort()
@@ -4354,26 +4593,13 @@ class Scheduler(SchedulerState, ServerNode):
         dh: dict = parent._host_info.setdefault(host, {})
         dh["last-seen"] = local_now
 
-        frac = 1 / len(parent._workers_dv)
-        parent._bandwidth = (
-            parent._bandwidth * (1 - frac) + metrics["bandwidth"]["total"] * frac
+        _update_bandwidths(
+            parent,
+            address,
+            metrics["bandwidth"],
+            self.bandwidth_workers,
+            self.bandwidth_types,
         )
-        for other, (bw, count) in metrics["bandwidth"]["workers"].items():
-            if (address, other) not in self.bandwidth_workers:
-                self.bandwidth_workers[address, other] = bw / count
-            else:
-                alpha = (1 - frac) ** count
-                self.bandwidth_workers[address, other] = self.bandwidth_workers[
-                    address, other
-                ] * alpha + bw * (1 - alpha)
-        for typ, (bw, count) in metrics["bandwidth"]["types"].items():
-            if typ not in self.bandwidth_types:
-                self.bandwidth_types[typ] = bw / count
-            else:
-                alpha = (1 - frac) ** count
-                self.bandwidth_types[typ] = self.bandwidth_types[typ] * alpha + bw * (
-                    1 - alpha
-                )
 
         ws._last_seen = local_now
         if executing is not None:
@@ -4387,16 +4613,6 @@ class Scheduler(SchedulerState, ServerNode):
 
         # Calculate RSS - dask keys, separating "old" and "new" usage
         # See MemoryState for details
-        max_memory_unmanaged_old_hist_age = local_now - parent.MEMORY_RECENT_TO_OLD_TIME
-        memory_unmanaged_old = ws._memory_unmanaged_old
-        while ws._memory_other_history:
-            timestamp, size = ws._memory_other_history[0]
-            if timestamp >= max_memory_unmanaged_old_hist_age:
-                break
-            ws._memory_other_history.popleft()
-            if size == memory_unmanaged_old:
-                memory_unmanaged_old = 0  # recalculate min()
-
         # metrics["memory"] is None if the worker sent a heartbeat before its
         # SystemMonitor ever had a chance to run.
         # ws._nbytes is updated at a different time and sizeof() may not be accurate,
@@ -4405,16 +4621,7 @@ class Scheduler(SchedulerState, ServerNode):
             0,
             (metrics["memory"] or 0) - ws._nbytes + metrics["spilled_nbytes"]["memory"],
         )
-
-        ws._memory_other_history.append((local_now, size))
-        if not memory_unmanaged_old:
-            # The worker has just been started or the previous minimum has been expunged
-            # because too old.
-            # Note: this algorithm is capped to 200 * MEMORY_RECENT_TO_OLD_TIME elements
-            # cluster-wide by heartbeat_interval(), regardless of the number of workers
-            ws._memory_unmanaged_old = min(map(second, ws._memory_other_history))
-        elif size < memory_unmanaged_old:
-            ws._memory_unmanaged_old = size
+        _update_memory_unmanaged_old(parent, ws, local_now, size)
 
         if host_info:
             dh = parent._host_info.setdefault(host, {})
@@ -4433,7 +4640,7 @@ class Scheduler(SchedulerState, ServerNode):
         return {
             "status": "OK",
             "time": local_now,
-            "heartbeat-interval": heartbeat_interval(len(parent._workers_dv)),
+            "heartbeat-interval": self._heartbeat_interval,
         }
 
     async def add_worker(
@@ -4502,6 +4709,14 @@ class Scheduler(SchedulerState, ServerNode):
             )
             if ws._status == Status.running:
                 parent._running.add(ws)
+            self._versions_snapshot[address] = ws._versions
+            self._client_version_warnings.clear()
+            if (
+                self._workers_restored is not None
+                and len(parent._workers_dv) >= self._workers_restored[0]
+            ):
+                self._workers_restored[1].set()
+            self._heartbeat_interval = heartbeat_interval(len(parent._workers_dv))
 
             dh: dict = parent._host_info.get(host)  # type: ignore
             if dh is None:
@@ -4517,6 +4732,11 @@ class Scheduler(SchedulerState, ServerNode):
 
             parent._total_nthreads += nthreads
             parent._aliases[name] = address
+            addresses = self._addresses_by_name_str.get(str(name))
+            if addresses is None:
+                self._addresses_by_name_str[str(name)] = {address}
+            else:
+                addresses.add(address)
 
             self.heartbeat_worker(
                 address=address,
@@ -4539,7 +4759,7 @@ class Scheduler(SchedulerState, ServerNode):
             if ws._nthreads > len(ws._processing):
                 parent._idle[ws._address] = ws
 
-            for plugin in list(self.plugins.values()):
+            for plugin in parent._plugins_tuple:
                 try:
                     result = plugin.add_worker(scheduler=self, worker=address)
                     if inspect.isawaitable(result):
@@ -4550,10 +4770,20 @@ class Scheduler(SchedulerState, ServerNode):
             recommendations: dict = {}
             client_msgs: dict = {}
             worker_msgs: dict = {}
+            new_recs: dict
+            new_cmsgs: dict
+            new_wmsgs: dict
+            msgs: list
+            new_msgs: list
             if nbytes:
                 assert isinstance(nbytes, dict)
                 already_released_keys = []
                 for key in nbytes:
+                    if key in recommendations:
+                        # An earlier key affected this one, e.g. it was one of
+                        # its dependencies. Settle it before looking at its state.
+                        parent._transitions(recommendations, client_msgs, worker_msgs)
+                        recommendations = {}
                     ts: TaskState = parent._tasks.get(key)  # type: ignore
                     if ts is not None and ts.state != "released":
                         if ts.state == "memory":
@@ -4566,11 +4796,22 @@ class Scheduler(SchedulerState, ServerNode):
                                 nbytes=nbytes[key],
                                 typename=types[key],
                             )
-                            recommendations, client_msgs, worker_msgs = t
-                            parent._transitions(
-                                recommendations, client_msgs, worker_msgs
-                            )
-                            recommendations = {}
+                            new_recs, new_cmsgs, new_wmsgs = t
+                            # Follow-up transitions are processed in a batch,
+                            # together with the unrunnable tasks below
+                            recommendations.update(new_recs)
+                            for c, new_msgs in new_cmsgs.items():
+                                msgs = client_msgs.get(c)  # type: ignore
+                                if msgs is not None:
+                                    msgs.extend(new_msgs)
+                                else:
+                                    client_msgs[c] = new_msgs
+                            for w, new_msgs in new_wmsgs.items():
+                                msgs = worker_msgs.get(w)  # type: ignore
+                                if msgs is not None:
+                                    msgs.extend(new_msgs)
+                                else:
+                                    worker_msgs[w] = new_msgs
                     else:
                         already_released_keys.append(key)
                 if already_released_keys:
@@ -4586,8 +4827,7 @@ class Scheduler(SchedulerState, ServerNode):
 
             if ws._status == Status.running:
                 for ts in parent._unrunnable:
-                    valid: set = self.valid_workers(ts)
-                    if valid is None or ws in valid:
+                    if parent.worker_is_valid(ts, ws):
                         recommendations[ts._key] = "waiting"
 
             if recommendations:
@@ -4600,21 +4840,13 @@ class Scheduler(SchedulerState, ServerNode):
             msg = {
                 "status": "OK",
                 "time": time(),
-                "heartbeat-interval": heartbeat_interval(len(parent._workers_dv)),
+                "heartbeat-interval": self._heartbeat_interval,
                 "worker-plugins": self.worker_plugins,
             }
 
-            cs: ClientState
             version_warning = version_module.error_message(
-                version_module.get_versions(),
-                merge(
-                    {w: ws._versions for w, ws in parent._workers_dv.items()},
-                    {
-                        c: cs._versions
-                        for c, cs in parent._clients.items()
-                        if cs._versions
-                    },
-                ),
+                self._get_own_versions(),
+                self._versions_snapshot,
                 versions,
                 client_name="This Worker",
             )
@@ -4714,17 +4946,18 @@ class Scheduler(SchedulerState, ServerNode):
         """
         parent: SchedulerState = cast(SchedulerState, self)
         start = time()
-        fifo_timeout = parse_timedelta(fifo_timeout)
-        keys = set(keys)
+        if not isinstance(fifo_timeout, Number):
+            fifo_timeout = _parse_fifo_timeout(fifo_timeout)
+        if not isinstance(keys, set):
+            keys = set(keys)
         if len(tasks) > 1:
             self.log_event(
                 ["all", client], {"action": "update_graph", "count": len(tasks)}
             )
 
         # Remove aliases
-        for k in list(tasks):
-            if tasks[k] is k:
-                del tasks[k]
+        for k in [k for k, v in tasks.items() if v is k]:
+            del tasks[k]
 
         dependencies = dependencies or {}
 
@@ -4738,86 +4971,81 @@ class Scheduler(SchedulerState, ServerNode):
         if code and code not in computation._code:  # add new code blocks
             computation._code.add(code)
 
-        n = 0
-        while len(tasks) != n:  # walk through new tasks, cancel any bad deps
-            n = len(tasks)
-            for k, deps in list(dependencies.items()):
-                if any(
-                    dep not in parent._tasks and dep not in tasks for dep in deps
-                ):  # bad key
-                    logger.info("User asked for computation on lost data, %s", k)
-                    del tasks[k]
-                    del dependencies[k]
-                    if k in keys:
-                        keys.remove(k)
-                    self.report({"op": "cancelled-key", "key": k}, client=client)
-                    self.client_releases_keys(keys=[k], client=client)
-
-        # Avoid computation that is already finished
-        ts: TaskState
-        already_in_memory = set()  # tasks that are already done
-        for k, v in dependencies.items():
-            if v and k in parent._tasks:
-                ts = parent._tasks[k]
-                if ts._state in ("memory", "erred"):
-                    already_in_memory.add(k)
-
-        dts: TaskState
-        if already_in_memory:
-            dependents = dask.core.reverse_dict(dependencies)
-            stack = list(already_in_memory)
-            done = set(already_in_memory)
-            while stack:  # remove unnecessary dependencies
-                key = stack.pop()
-                ts = parent._tasks[key]
-                try:
-                    deps = dependencies[key]
-                except KeyError:
-                    deps = self.dependencies[key]
-                for dep in deps:
-                    if dep in dependents:
-                        child_deps = dependents[dep]
-                    else:
-                        child_deps = self.dependencies[dep]
-                    if all(d in done for d in child_deps):
-                        if dep in parent._tasks and dep not in done:
-                            done.add(dep)
-                            stack.append(dep)
-
-            for d in done:
-                tasks.pop(d, None)
-                dependencies.pop(d, None)
+        # Walk through new tasks, cancel any that depend on lost data. Cancelling a
+        # key propagates to its dependents through a reverse mapping, so this is
+        # linear in the size of the graph rather than a fixed-point iteration.
+        # Releasing keys may forget other tasks, hence the outer rescan.
+        dependents = None
+        while True:
+            bad_keys = [
+                k
+                for k, deps in dependencies.items()
+                if any(dep not in parent._tasks and dep not in tasks for dep in deps)
+            ]
+            if not bad_keys:
+                break
+            if dependents is None:
+                dependents = dask.core.reverse_dict(dependencies)
+            cancelled: list = []
+            while bad_keys:
+                k = bad_keys.pop()
+                if k not in dependencies:  # already cancelled
+                    continue
+                logger.info("User asked for computation on lost data, %s", k)
+                del tasks[k]
+                del dependencies[k]
+                cancelled.append(k)
+                if k not in parent._tasks:
+                    bad_keys.extend(dependents[k])
+            # Don't mutate a set that may belong to the caller
+            keys = keys.difference(cancelled)
+            self.report_cancelled_keys(cancelled, client=client)
+            self.client_releases_keys(keys=cancelled, client=client)
 
         # Get or create task states
-        stack = list(keys)
-        touched_keys = set()
-        touched_tasks = []
+        ts: TaskState
+        dts: TaskState
+        task_states: dict = parent._tasks
+        stack: list = list(keys)
+        touched_keys: set = set()
+        touched_tasks: list = []
+        # (ts, dependency keys) of touched tasks that don't have dependencies yet
+        new_dependencies: list = []
         while stack:
             k = stack.pop()
             if k in touched_keys:
                 continue
             # XXX Have a method get_task_state(self, k) ?
-            ts = parent._tasks.get(k)
+            ts = task_states.get(k)
             if ts is None:
                 ts = parent.new_task(
                     k, tasks.get(k), "released", computation=computation
                 )
+            elif ts._state in ("memory", "erred") and dependencies.get(k):
+                # Avoid computation that is already finished: don't walk into
+                # the dependencies of a task whose result we already have
+                tasks.pop(k, None)
+                del dependencies[k]
+                touched_keys.add(k)
+                touched_tasks.append(ts)
+                continue
             elif not ts._run_spec:
                 ts._run_spec = tasks.get(k)
 
             touched_keys.add(k)
             touched_tasks.append(ts)
-            stack.extend(dependencies.get(k, ()))
+            deps = dependencies.get(k)
+            if deps:
+                stack.extend(deps)
+                if not ts._dependencies:
+                    new_dependencies.append((ts, deps))
 
         self.client_desires_keys(keys=keys, client=client)
 
         # Add dependencies
-        for key, deps in dependencies.items():
-            ts = parent._tasks.get(key)
-            if ts is None or ts._dependencies:
-                continue
+        for ts, deps in new_dependencies:
             for dep in deps:
-                dts = parent._tasks[dep]
+                dts = task_states[dep]
                 ts.add_dependency(dts)
 
         # Compute priorities
@@ -4832,28 +5060,22 @@ class Scheduler(SchedulerState, ServerNode):
 
         # Override existing taxonomy with per task annotations
         if annotations:
-            if "priority" in annotations:
-                user_priority.update(annotations["priority"])
-
-            if "workers" in annotations:
-                restrictions.update(annotations["workers"])
-
-            if "allow_other_workers" in annotations:
-                loose_restrictions.extend(
-                    k for k, v in annotations["allow_other_workers"].items() if v
-                )
-
-            if "retries" in annotations:
-                retries.update(annotations["retries"])
-
-            if "resources" in annotations:
-                resources.update(annotations["resources"])
-
             for a, kv in annotations.items():
+                if a == "priority":
+                    user_priority.update(kv)
+                elif a == "workers":
+                    restrictions.update(kv)
+                elif a == "allow_other_workers":
+                    loose_restrictions.extend(k for k, v in kv.items() if v)
+                elif a == "retries":
+                    retries.update(kv)
+                elif a == "resources":
+                    resources.update(kv)
+
                 for k, v in kv.items():
                     # Tasks might have been culled, in which case
                     # we have nothing to annotate.
-                    ts = parent._tasks.get(k)
+                    ts = task_states.get(k)
                     if ts is not None:
                         ts._annotations[a] = v
 
@@ -4861,15 +5083,14 @@ class Scheduler(SchedulerState, ServerNode):
         if actors is True:
             actors = list(keys)
         for actor in actors or []:
-            ts = parent._tasks[actor]
+            ts = task_states[actor]
             ts._actor = True
 
-        priority = priority or dask.order.order(
-            tasks
-        )  # TODO: define order wrt old graph
+        if priority is None:
+            priority = dask.order.order(tasks)  # TODO: define order wrt old graph
 
         if submitting_task:  # sub-tasks get better priority than parent tasks
-            ts = parent._tasks.get(submitting_task)
+            ts = task_states.get(submitting_task)
             if ts is not None:
                 generation = ts._priority[0] - 0.01
             else:  # super-task already cleaned up
@@ -4881,16 +5102,10 @@ class Scheduler(SchedulerState, ServerNode):
         else:
             generation = self.generation
 
-        for key in set(priority) & touched_keys:
-            ts = parent._tasks[key]
-            if ts._priority is None:
-                ts._priority = (-(user_priority.get(key, 0)), generation, priority[key])
-
         # Ensure all runnables have a priority
-        runnables = [ts for ts in touched_tasks if ts._run_spec]
-        for ts in runnables:
-            if ts._priority is None and ts._run_spec:
-                ts._priority = (self.generation, 0)
+        runnables: list = _assign_priorities(
+            touched_tasks, priority, user_priority, generation, self.generation
+        )
 
         if restrictions:
             # *restrictions* is a dict keying task ids to lists of
@@ -4898,7 +5113,7 @@ class Scheduler(SchedulerState, ServerNode):
             for k, v in restrictions.items():
                 if v is None:
                     continue
-                ts = parent._tasks.get(k)
+                ts = task_states.get(k)
                 if ts is None:
                     continue
                 ts._host_restrictions = set()
@@ -4917,7 +5132,7 @@ class Scheduler(SchedulerState, ServerNode):
 
             if loose_restrictions:
                 for k in loose_restrictions:
-                    ts = parent._tasks[k]
+                    ts = task_states[k]
                     ts._loose_restrictions = True
 
         if resources:
@@ -4925,7 +5140,7 @@ class Scheduler(SchedulerState, ServerNode):
                 if v is None:
                     continue
                 assert isinstance(v, dict)
-                ts = parent._tasks.get(k)
+                ts = task_states.get(k)
                 if ts is None:
                     continue
                 ts._resource_restrictions = v
@@ -4933,7 +5148,7 @@ class Scheduler(SchedulerState, ServerNode):
         if retries:
             for k, v in retries.items():
                 assert isinstance(v, int)
-                ts = parent._tasks.get(k)
+                ts = task_states.get(k)
                 if ts is None:
                     continue
                 ts._retries = v
@@ -4941,9 +5156,14 @@ class Scheduler(SchedulerState, ServerNode):
         # Compute recommendations
         recommendations: dict = {}
 
-        for ts in sorted(runnables, key=operator.attrgetter("priority"), reverse=True):
-            if ts._state == "released" and ts._run_spec:
-                recommendations[ts._key] = "waiting"
+        # _transitions pops recommendations from the end, so insert them in
+        # reverse priority order to start the most important tasks first.
+        # Only released tasks are recommended, so only those need sorting.
+        released: list = [ts for ts in runnables if ts._state == "released"]
+        if len(released) > 1:
+            released.sort(key=operator.attrgetter("priority"), reverse=True)
+        for ts in released:
+            recommendations[ts._key] = "waiting"
 
         for ts in touched_tasks:
             for dts in ts._dependencies:
@@ -4952,7 +5172,7 @@ class Scheduler(SchedulerState, ServerNode):
                     recommendations[ts._key] = "erred"
                     break
 
-        for plugin in list(self.plugins.values()):
+        for plugin in parent._plugins_tuple:
             try:
                 plugin.update_graph(
                     self,
@@ -4986,9 +5206,11 @@ class Scheduler(SchedulerState, ServerNode):
         parent: SchedulerState = cast(SchedulerState, self)
         logger.debug("Stimulus task finished %s, %s", key, worker)
 
-        recommendations: dict = {}
-        client_msgs: dict = {}
-        worker_msgs: dict = {}
+        # The message dicts are created per branch; the common path gets them
+        # from _transition
+        recommendations: dict
+        client_msgs: dict
+        worker_msgs: dict
 
         ws: WorkerState = parent._workers_dv[worker]
         ts: TaskState = parent._tasks.get(key)
@@ -5001,15 +5223,19 @@ class Scheduler(SchedulerState, ServerNode):
                 key,
                 ts._who_has if ts else {},
             )
-            worker_msgs[worker] = [
-                {
-                    "op": "free-keys",
-                    "keys": [key],
-                    "stimulus_id": f"already-released-or-forgotten-{time()}",
-                }
-            ]
+            recommendations, client_msgs = {}, {}
+            worker_msgs = {
+                worker: [
+                    {
+                        "op": "free-keys",
+                        "keys": [key],
+                        "stimulus_id": f"already-released-or-forgotten-{time()}",
+                    }
+                ]
+            }
         elif ts._state == "memory":
             self.add_keys(worker=worker, keys=[key])
+            recommendations, client_msgs, worker_msgs = {}, {}, {}
         else:
             ts._metadata.update(kwargs["metadata"])
             r: tuple = parent._transition(key, "memory", worker=worker, **kwargs)
@@ -5057,6 +5283,8 @@ class Scheduler(SchedulerState, ServerNode):
         dts: TaskState
         while stack:
             key = stack.pop()
+            if key in seen:  # shared erred dependency, already handled
+                continue
             seen.add(key)
             ts = parent._tasks[key]
             erred_deps = [dts._key for dts in ts._dependencies if dts._state == "erred"]
@@ -5095,14 +5323,25 @@ class Scheduler(SchedulerState, ServerNode):
             host = get_address_host(address)
 
             ws: WorkerState = parent._workers_dv[address]
+            ts: TaskState
 
-            event_msg = {
-                "action": "remove-worker",
-                "processing-tasks": dict(ws._processing),
-            }
-            self.log_event(address, event_msg.copy())
-            event_msg["worker"] = address
-            self.log_event("all", event_msg)
+            # Shared by both events; record keys rather than holding on to the
+            # TaskStates themselves
+            processing_tasks: dict = {}
+            for ts, duration in ws._processing.items():
+                processing_tasks[ts._key] = duration
+            self.log_event(
+                address,
+                {"action": "remove-worker", "processing-tasks": processing_tasks},
+            )
+            self.log_event(
+                "all",
+                {
+                    "action": "remove-worker",
+                    "processing-tasks": processing_tasks,
+                    "worker": address,
+                },
+            )
 
             logger.info("Remove worker %s", ws)
             if close:
@@ -5122,16 +5361,22 @@ class Scheduler(SchedulerState, ServerNode):
             self.rpc.remove(address)
             del self.stream_comms[address]
             del parent._aliases[ws._name]
+            addresses = self._addresses_by_name_str[str(ws._name)]
+            addresses.discard(address)
+            if not addresses:
+                del self._addresses_by_name_str[str(ws._name)]
             parent._idle.pop(ws._address, None)
             parent._saturated.discard(ws)
             del parent._workers[address]
+            self._heartbeat_interval = heartbeat_interval(len(parent._workers_dv))
+            self._versions_snapshot.pop(address, None)
+            self._client_version_warnings.clear()
             ws.status = Status.closed
             parent._running.discard(ws)
             parent._total_occupancy -= ws._occupancy
 
             recommendations: dict = {}
 
-            ts: TaskState
             for ts in list(ws._processing):
                 k = ts._key
                 recommendations[k] = "released"
@@ -5162,7 +5407,11 @@ class Scheduler(SchedulerState, ServerNode):
 
             self.transitions(recommendations)
 
-            for plugin in list(self.plugins.values()):
+            retiring = parent._retiring.get(ws)
+            if retiring is not None:
+                retiring.set()
+
+            for plugin in parent._plugins_tuple:
                 try:
                     result = plugin.remove_worker(scheduler=self, worker=address)
                     if inspect.isawaitable(result):
@@ -5172,20 +5421,16 @@ class Scheduler(SchedulerState, ServerNode):
 
             if not parent._workers_dv:
                 logger.info("Lost all workers")
+                if self._workers_removed is not None:
+                    self._workers_removed.set()
 
-            for w in parent._workers_dv:
-                self.bandwidth_workers.pop((address, w), None)
-                self.bandwidth_workers.pop((w, address), None)
-
-            def remove_worker_from_events():
-                # If the worker isn't registered anymore after the delay, remove from events
-                if address not in parent._workers_dv and address in self.events:
-                    del self.events[address]
+            bandwidth_workers = self.bandwidth_workers
+            if bandwidth_workers:
+                for w in parent._workers_dv:
+                    bandwidth_workers.pop((address, w), None)
+                    bandwidth_workers.pop((w, address), None)
 
-            cleanup_delay = parse_timedelta(
-                dask.config.get("distributed.scheduler.events-cleanup-delay")
-            )
-            self.loop.call_later(cleanup_delay, remove_worker_from_events)
+            self._events_pending_cleanup[address] = time() + self._events_cleanup_delay
             logger.debug("Removed worker %s", ws)
 
         return "OK"
@@ -5216,14 +5461,35 @@ class Scheduler(SchedulerState, ServerNode):
                     0.2, lambda: self.cancel_key(key, client, retries - 1)
                 )
             return
-        if force or ts._who_wants == {cs}:  # no one else wants this key
-            for dts in list(ts._dependents):
-                self.cancel_key(dts._key, client, force=force)
-        logger.info("Scheduler cancels key %s.  Force=%s", key, force)
-        self.report({"op": "cancelled-key", "key": key})
-        clients = list(ts._who_wants) if force else [cs]
-        for cs in clients:
-            self.client_releases_keys(keys=[key], client=cs._client_key)
+
+        # Walk the dependents iteratively, visiting shared dependents of
+        # diamond-shaped graphs only once
+        cancelled: list = []
+        seen: set = {ts}
+        stack: list = [ts]
+        while stack:
+            ts = stack.pop()
+            if not ts._who_wants:
+                continue
+            cancelled.append(ts)
+            if force or ts._who_wants == {cs}:  # no one else wants this key
+                for dts in ts._dependents:
+                    if dts not in seen:
+                        seen.add(dts)
+                        stack.append(dts)
+
+        # Release everything in one batch per client.  reversed(cancelled) is a
+        # reversed DFS preorder, not a topological order, so this relies on
+        # client_releases_keys handling the whole batch together
+        releases: dict = defaultdict(list)
+        other: ClientState
+        for ts in reversed(cancelled):
+            logger.info("Scheduler cancels key %s.  Force=%s", ts._key, force)
+            for other in ts._who_wants if force else [cs]:
+                releases[other._client_key].append(ts._key)
+        self.report_cancelled_keys([ts._key for ts in reversed(cancelled)])
+        for client_key, keys in releases.items():
+            self.client_releases_keys(keys=keys, client=client_key)
 
     def client_desires_keys(self, keys=None, client=None):
         parent: SchedulerState = cast(SchedulerState, self)
@@ -5343,9 +5609,8 @@ class Scheduler(SchedulerState, ServerNode):
                 logger.debug("Key lost: %s", key)
             else:
                 ts.validate()
-                try:
-                    func = getattr(self, "validate_" + ts._state.replace("-", "_"))
-                except AttributeError:
+                func = self._state_validators.get(ts._state)
+                if func is None:
                     logger.error(
                         "self.validate_%s not found", ts._state.replace("-", "_")
                     )
@@ -5464,6 +5729,46 @@ class Scheduler(SchedulerState, ServerNode):
                         "Closed comm %r while trying to write %s", c, msg, exc_info=True
                     )
 
+    def report_cancelled_keys(self, keys: list, client: str = None):
+        """
+        Tell clients that *keys* have been cancelled
+
+        Every key is routed like ``report({"op": "cancelled-key", "key": key})``
+        would, but each client receives a single ``cancelled-keys`` message.
+        """
+        for c, ks in self._keys_by_client(keys, client).items():
+            self.client_send(c, {"op": "cancelled-keys", "keys": ks})
+
+    def report_keys_in_memory(self, keys: list, client: str = None):
+        """
+        Tell clients that *keys* are in memory
+
+        Every key is routed like ``report({"op": "key-in-memory", "key": key})``
+        would, but each client receives a single ``keys-in-memory`` message.
+        """
+        for c, ks in self._keys_by_client(keys, client).items():
+            self.client_send(c, {"op": "keys-in-memory", "keys": ks})
+
+    def _keys_by_client(self, keys: list, client: str = None) -> dict:
+        """Group *keys* by the clients that :meth:`report` would notify about them"""
+        parent: SchedulerState = cast(SchedulerState, self)
+        ts: TaskState
+        cs: ClientState
+        client_keys: dict = defaultdict(list)
+        for key in keys:
+            ts = parent._tasks.get(key)
+            if ts is None:
+                # Notify all clients
+                for c in self.client_comms:
+                    client_keys[c].append(key)
+                continue
+            for cs in ts._who_wants:
+                if cs._client_key != client:
+                    client_keys[cs._client_key].append(key)
+            if client is not None:
+                client_keys[client].append(key)
+        return client_keys
+
     async def add_client(self, comm: Comm, client: str, versions: dict) -> None:
         """Add client to network
 
@@ -5474,9 +5779,12 @@ class Scheduler(SchedulerState, ServerNode):
         comm.name = "Scheduler->Client"
         logger.info("Receive client connection: %s", client)
         self.log_event(["all", client], {"action": "add-client", "client": client})
-        parent._clients[client] = ClientState(client, versions=versions)
+        cs: ClientState = ClientState(client, versions=versions)
+        parent._clients[client] = cs
+        if cs._versions:
+            self._versions_snapshot[client] = cs._versions
 
-        for plugin in list(self.plugins.values()):
+        for plugin in parent._plugins_tuple:
             try:
                 plugin.add_client(scheduler=self, client=client)
             except Exception as e:
@@ -5487,13 +5795,7 @@ class Scheduler(SchedulerState, ServerNode):
             bcomm.start(comm)
             self.client_comms[client] = bcomm
             msg = {"op": "stream-start"}
-            ws: WorkerState
-            version_warning = version_module.error_message(
-                version_module.get_versions(),
-                {w: ws._versions for w, ws in parent._workers_dv.items()},
-                versions,
-            )
-            msg.update(version_warning)
+            msg.update(self._get_client_version_warning(versions))
             bcomm.send(msg)
 
             try:
@@ -5519,33 +5821,23 @@ class Scheduler(SchedulerState, ServerNode):
         if self.status == Status.running:
             logger.info("Remove client %s", client)
         self.log_event(["all", client], {"action": "remove-client", "client": client})
-        try:
-            cs: ClientState = parent._clients[client]
-        except KeyError:
-            # XXX is this a legitimate condition?
-            pass
-        else:
+        cs: ClientState = parent._clients.get(client)  # type: ignore
+        # XXX is a missing client a legitimate condition?
+        if cs is not None:
             ts: TaskState
             self.client_releases_keys(
                 keys=[ts._key for ts in cs._wants_what], client=cs._client_key
             )
             del parent._clients[client]
+            self._versions_snapshot.pop(client, None)
 
-            for plugin in list(self.plugins.values()):
+            for plugin in parent._plugins_tuple:
                 try:
                     plugin.remove_client(scheduler=self, client=client)
                 except Exception as e:
                     logger.exception(e)
 
-        def remove_client_from_events():
-            # If the client isn't registered anymore after the delay, remove from events
-            if client not in parent._clients and client in self.events:
-                del self.events[client]
-
-        cleanup_delay = parse_timedelta(
-            dask.config.get("distributed.scheduler.events-cleanup-delay")
-        )
-        self.loop.call_later(cleanup_delay, remove_client_from_events)
+        self._events_pending_cleanup[client] = time() + self._events_cleanup_delay
 
     def send_task_to_worker(self, worker, ts: TaskState, duration: double = -1):
         """Send a single computational task to a worker"""
@@ -5561,8 +5853,9 @@ class Scheduler(SchedulerState, ServerNode):
                 pdb.set_trace()
             raise
 
-    def handle_uncaught_error(self, **msg):
-        logger.exception(clean_exception(**msg)[1])
+    def handle_uncaught_error(self, exception=None, **msg):
+        # Only the exception is logged; don't unpickle the traceback
+        logger.exception(clean_exception(exception)[1])
 
     def handle_task_finished(self, key=None, worker=None, **msg):
         parent: SchedulerState = cast(SchedulerState, self)
@@ -5618,7 +5911,7 @@ class Scheduler(SchedulerState, ServerNode):
 
         if ws is not None and ws in ts._who_has:
             parent.remove_replica(ts, ws)
-        if ts.state == "memory" and not ts._who_has:
+        if ts._state == "memory" and not ts._who_has:
             if ts._run_spec:
                 self.transitions({key: "released"})
             else:
@@ -5649,7 +5942,7 @@ class Scheduler(SchedulerState, ServerNode):
             logger.debug("Skipping long_running since key %s was already released", key)
             return
         ts: TaskState = parent._tasks[key]
-        steal = parent._extensions.get("stealing")
+        steal = parent._stealing_ext
         if steal is not None:
             steal.remove_key_from_stealable(ts)
 
@@ -5686,9 +5979,9 @@ class Scheduler(SchedulerState, ServerNode):
         if not ws:
             return
         prev_status = ws._status
-        ws._status = Status.lookup[status]  # type: ignore
-        if ws._status == prev_status:
+        if prev_status.name == status:
             return
+        ws._status = Status.lookup[status]  # type: ignore
 
         self.log_event(
             ws._address,
@@ -5705,8 +5998,7 @@ class Scheduler(SchedulerState, ServerNode):
             recs = {}
             ts: TaskState
             for ts in parent._unrunnable:
-                valid: set = self.valid_workers(ts)
-                if valid is None or ws in valid:
+                if parent.worker_is_valid(ts, ws):
                     recs[ts._key] = "waiting"
             if recs:
                 client_msgs: dict = {}
@@ -5786,7 +6078,9 @@ class Scheduler(SchedulerState, ServerNode):
                 category=UserWarning,
             )
 
-        self.plugins[name] = plugin
+        parent: SchedulerState = cast(SchedulerState, self)
+        parent._plugins[name] = plugin
+        parent._plugins_tuple = tuple(parent._plugins.values())
 
     def remove_plugin(
         self,
@@ -5833,12 +6127,14 @@ class Scheduler(SchedulerState, ServerNode):
         assert name is not None
         # End deprecated code
 
+        parent: SchedulerState = cast(SchedulerState, self)
         try:
-            del self.plugins[name]
+            del parent._plugins[name]
         except KeyError:
             raise ValueError(
                 f"Could not find plugin {name!r} among the current scheduler plugins"
             )
+        parent._plugins_tuple = tuple(parent._plugins.values())
 
     async def register_scheduler_plugin(self, plugin, name=None, idempotent=None):
         """Register a plugin on the scheduler."""
@@ -5892,6 +6188,8 @@ class Scheduler(SchedulerState, ServerNode):
 
     def send_all(self, client_msgs: dict, worker_msgs: dict):
         """Send messages to client and workers"""
+        if not client_msgs and not worker_msgs:
+            return
         client_comms: dict = self.client_comms
         stream_comms: dict = self.stream_comms
         msgs: list
@@ -5901,7 +6199,7 @@ class Scheduler(SchedulerState, ServerNode):
             if c is None:
                 continue
             try:
-                c.send(*msgs)
+                c.extend(msgs)
             except CommClosedError:
                 if self.status == Status.running:
                     logger.critical(
@@ -5914,7 +6212,7 @@ class Scheduler(SchedulerState, ServerNode):
         for worker, msgs in worker_msgs.items():
             try:
                 w = stream_comms[worker]
-                w.send(*msgs)
+                w.extend(msgs)
             except KeyError:
                 # worker already gone
                 pass
@@ -5943,14 +6241,19 @@ class Scheduler(SchedulerState, ServerNode):
         parent: SchedulerState = cast(SchedulerState, self)
         ws: WorkerState
 
+        if workers is not None:
+            workers = [self.coerce_address(w) for w in workers]
+
         start = time()
         while True:
             if workers is None:
                 wss = parent._running
             else:
-                workers = [self.coerce_address(w) for w in workers]
-                wss = {parent._workers_dv[w] for w in workers}
-                wss = {ws for ws in wss if ws._status == Status.running}
+                wss = set()
+                for w in workers:
+                    ws = parent._workers_dv[w]
+                    if ws._status == Status.running:
+                        wss.add(ws)
 
             if wss:
                 break
@@ -5958,7 +6261,7 @@ class Scheduler(SchedulerState, ServerNode):
                 raise TimeoutError("No valid workers found")
             await asyncio.sleep(0.1)
 
-        nthreads = {ws._address: ws.nthreads for ws in wss}
+        nthreads = {ws._address: ws._nthreads for ws in wss}
 
         assert isinstance(data, dict)
 
@@ -5981,14 +6284,14 @@ class Scheduler(SchedulerState, ServerNode):
         """Collect data from workers to the scheduler"""
         parent: SchedulerState = cast(SchedulerState, self)
         ws: WorkerState
+        ts: TaskState
+        tasks: dict = parent._tasks
         keys = list(keys)
-        who_has = {}
+        who_has: dict = {}
         for key in keys:
-            ts: TaskState = parent._tasks.get(key)
-            if ts is not None:
-                who_has[key] = [ws._address for ws in ts._who_has]
-            else:
-                who_has[key] = []
+            ts = tasks.get(key)
+            # Keys without replicas are kept so that they're reported as missing
+            who_has[key] = [ws._address for ws in ts._who_has] if ts is not None else []
 
         data, missing_keys, missing_workers = await gather_from_workers(
             who_has, rpc=self.rpc, close=False, serializers=serializers
@@ -5997,8 +6300,7 @@ class Scheduler(SchedulerState, ServerNode):
             result = {"status": "OK", "data": data}
         else:
             missing_states = [
-                (parent._tasks[key].state if key in parent._tasks else None)
-                for key in missing_keys
+                (tasks[key].state if key in tasks else None) for key in missing_keys
             ]
             logger.exception(
                 "Couldn't gather keys %s state: %s workers: %s",
@@ -6016,13 +6318,13 @@ class Scheduler(SchedulerState, ServerNode):
                         for worker in missing_workers
                     )
                 )
-                recommendations: dict
+                recommendations: dict = {}
                 client_msgs: dict = {}
                 worker_msgs: dict = {}
                 for key, workers in missing_keys.items():
                     # Task may already be gone if it was held by a
                     # `missing_worker`
-                    ts: TaskState = parent._tasks.get(key)
+                    ts = tasks.get(key)
                     logger.exception(
                         "Workers don't have promised key: %s, %s",
                         str(workers),
@@ -6030,14 +6332,13 @@ class Scheduler(SchedulerState, ServerNode):
                     )
                     if not workers or ts is None:
                         continue
-                    recommendations: dict = {key: "released"}
                     for worker in workers:
                         ws = parent._workers_dv.get(worker)
                         if ws is not None and ws in ts._who_has:
                             parent.remove_replica(ts, ws)
-                            parent._transitions(
-                                recommendations, client_msgs, worker_msgs
-                            )
+                            recommendations[key] = "released"
+                if recommendations:
+                    parent._transitions(recommendations, client_msgs, worker_msgs)
                 self.send_all(client_msgs, worker_msgs)
 
         self.log_event("all", {"action": "gather", "count": len(keys)})
@@ -6068,19 +6369,24 @@ class Scheduler(SchedulerState, ServerNode):
             ws: WorkerState
             nannies = {addr: ws._nanny for addr, ws in parent._workers_dv.items()}
 
-            for addr in list(parent._workers_dv):
-                try:
-                    # Ask the worker to close if it doesn't have a nanny,
-                    # otherwise the nanny will kill it anyway
-                    await self.remove_worker(address=addr, close=addr not in nannies)
-                except Exception:
+            # Ask the worker to close if it doesn't have a nanny,
+            # otherwise the nanny will kill it anyway
+            results = await asyncio.gather(
+                *(
+                    self.remove_worker(address=addr, close=addr not in nannies)
+                    for addr in list(parent._workers_dv)
+                ),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, Exception):
                     logger.info(
-                        "Exception while restarting.  This is normal", exc_info=True
+                        "Exception while restarting.  This is normal", exc_info=result
                     )
 
             self.clear_task_state()
 
-            for plugin in list(self.plugins.values()):
+            for plugin in parent._plugins_tuple:
                 try:
                     plugin.restart(self)
                 except Exception as e:
@@ -6124,9 +6430,12 @@ class Scheduler(SchedulerState, ServerNode):
                     c.cancel()
 
             self.log_event([client, "all"], {"action": "restart", "client": client})
-            start = time()
-            while time() < start + 10 and len(parent._workers_dv) < n_workers:
-                await asyncio.sleep(0.01)
+            if len(parent._workers_dv) < n_workers:
+                # Wait for the workers to come back; set by add_worker
+                self._workers_restored = (n_workers, asyncio.Event())
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._workers_restored[1].wait(), timeout=10)
+                self._workers_restored = None
 
             self.report({"op": "restart"})
 
@@ -6167,10 +6476,18 @@ class Scheduler(SchedulerState, ServerNode):
             addresses = workers
 
         ERROR = object()
+        # Bound the number of connections being opened at once, so a large
+        # cluster isn't hit with a burst of handshakes. The messages themselves
+        # are not bounded: handlers may wait on each other (e.g. a barrier in
+        # Client.run), so every worker must receive its message.
+        sem = asyncio.Semaphore(
+            dask.config.get("distributed.scheduler.broadcast-concurrency")
+        )
 
         async def send_message(addr):
             try:
-                comm = await self.rpc.connect(addr)
+                async with sem:
+                    comm = await self.rpc.connect(addr)
                 comm.name = "Scheduler Broadcast"
                 try:
                     resp = await send_recv(
@@ -6195,9 +6512,12 @@ class Scheduler(SchedulerState, ServerNode):
                         f"or 'ignore'; got {on_error!r}"
                     )
 
-        results = await All(
-            [send_message(address) for address in addresses if address is not None]
-        )
+        coros = [send_message(address) for address in addresses if address is not None]
+        if len(coros) == 1:
+            # e.g. proxy(); no need to wrap a single message in a Task
+            results = [await coros[0]]
+        else:
+            results = await All(coros)
 
         return {k: v for k, v in zip(workers, results) if v is not ERROR}
 
@@ -6256,18 +6576,25 @@ class Scheduler(SchedulerState, ServerNode):
         else:  # pragma: nocover
             raise ValueError(f"Unexpected message from {worker_address}: {result}")
 
+        ts: TaskState
+        new_replicas: list = []
         for key in keys_ok:
-            ts: TaskState = parent._tasks.get(key)  # type: ignore
+            ts = parent._tasks.get(key)  # type: ignore
             if ts is None or ts._state != "memory":
                 logger.warning(f"Key lost during replication: {key}")
                 continue
             if ws not in ts._who_has:
-                parent.add_replica(ts, ws)
+                new_replicas.append(ts)
+        parent.add_replicas(new_replicas, ws)
 
         return keys_failed
 
     async def delete_worker_data(
-        self, worker_address: str, keys: "Collection[str]"
+        self,
+        worker_address: str,
+        keys: "Collection[str]",
+        *,
+        stimulus_id: "str | None" = None,
     ) -> None:
         """Delete data from a worker and update the corresponding worker/task states
 
@@ -6277,14 +6604,19 @@ class Scheduler(SchedulerState, ServerNode):
             Worker address to delete keys from
         keys: list[str]
             List of keys to delete on the specified worker
+        stimulus_id: str, optional
+            Stimulus ID sent to the worker. Callers deleting from many workers at
+            once can share one; defaults to a new ``delete-data-<time>`` ID.
         """
         parent: SchedulerState = cast(SchedulerState, self)
+        if stimulus_id is None:
+            stimulus_id = f"delete-data-{time()}"
 
         try:
             await retry_operation(
                 self.rpc(addr=worker_address).free_keys,
                 keys=list(keys),
-                stimulus_id=f"delete-data-{time()}",
+                stimulus_id=stimulus_id,
             )
         except OSError as e:
             # This can happen e.g. if the worker is going through controlled shutdown;
@@ -6460,17 +6792,23 @@ class Scheduler(SchedulerState, ServerNode):
         #   are at the top of the smallest-first heaps.
         # - snd_bytes_min/rec_bytes_min: minimum number of bytes after sending/receiving
         #   which the worker should not be considered anymore. This is also negative.
-        # - arbitrary unique number, there just to to make sure that WorkerState objects
-        #   are never used for sorting in the unlikely event that two processes have
-        #   exactly the same number of bytes allocated.
-        # - WorkerState
-        # - iterator of all tasks in memory on the worker (senders only), insertion
+        # - index of the worker in sender_ws/recipient_ws. This also makes sure that
+        #   ties between two workers with exactly the same number of bytes allocated
+        #   are broken without comparing anything else.
+        #
+        # Per-worker state lives in lists alongside the heaps, indexed as above, so
+        # that the heap elements stay small:
+        # - sender_ws/recipient_ws: WorkerState
+        # - sender_iters: iterator of all tasks in memory on the worker, insertion
         #   sorted (least recently inserted first).
         #   Note that this iterator will typically *not* be exhausted. It will only be
         #   exhausted if, after moving away from the worker all keys that can be moved,
         #   is insufficient to drop snd_bytes_min above 0.
-        senders: "list[tuple[int, int, int, WorkerState, Iterator[TaskState]]]" = []
-        recipients: "list[tuple[int, int, int, WorkerState]]" = []
+        senders: "list[tuple[int, int, int]]" = []
+        recipients: "list[tuple[int, int, int]]" = []
+        sender_ws: "list[WorkerState]" = []
+        sender_iters: "list[Iterator[TaskState]]" = []
+        recipient_ws: "list[WorkerState]" = []
 
         # Output: [(sender, recipient, task), ...]
         msgs: "list[tuple[WorkerState, WorkerState, TaskState]]" = []
@@ -6479,16 +6817,29 @@ class Scheduler(SchedulerState, ServerNode):
         # unmanaged memory that appeared over the last 30 seconds
         # (distributed.worker.memory.recent-to-old-time).
         # This lets us ignore temporary spikes caused by task heap usage.
-        memory_by_worker = [
-            (ws, getattr(ws.memory, parent.MEMORY_REBALANCE_MEASURE)) for ws in workers
-        ]
-        mean_memory = sum(m for _, m in memory_by_worker) // len(memory_by_worker)
-
+        measure: str = parent.MEMORY_REBALANCE_MEASURE
+        memory_by_worker: list = []
+        total_memory: Py_ssize_t = 0
+        ws_memory: Py_ssize_t
+        for ws in workers:
+            ws_memory = getattr(ws.memory, measure)
+            memory_by_worker.append((ws, ws_memory))
+            total_memory += ws_memory
+        mean_memory = total_memory // len(memory_by_worker)
+
+        half_gap_frac: double = parent.MEMORY_REBALANCE_HALF_GAP
+        sender_min_frac: double = parent.MEMORY_REBALANCE_SENDER_MIN
+        recipient_max_frac: double = parent.MEMORY_REBALANCE_RECIPIENT_MAX
+        memory_limit: Py_ssize_t
+        half_gap: Py_ssize_t
+        sender_min: double
+        recipient_max: double
         for ws, ws_memory in memory_by_worker:
-            if ws.memory_limit:
-                half_gap = int(parent.MEMORY_REBALANCE_HALF_GAP * ws.memory_limit)
-                sender_min = parent.MEMORY_REBALANCE_SENDER_MIN * ws.memory_limit
-                recipient_max = parent.MEMORY_REBALANCE_RECIPIENT_MAX * ws.memory_limit
+            memory_limit = ws._memory_limit
+            if memory_limit:
+                half_gap = int(half_gap_frac * memory_limit)
+                sender_min = sender_min_frac * memory_limit
+                recipient_max = recipient_max_frac * memory_limit
             else:
                 half_gap = 0
                 sender_min = 0.0
@@ -6503,15 +6854,16 @@ class Scheduler(SchedulerState, ServerNode):
                 snd_bytes_max = mean_memory - ws_memory  # negative
                 snd_bytes_min = snd_bytes_max + half_gap  # negative
                 # See definition of senders above
-                senders.append(
-                    (snd_bytes_max, snd_bytes_min, id(ws), ws, iter(ws._has_what))
-                )
+                senders.append((snd_bytes_max, snd_bytes_min, len(sender_ws)))
+                sender_ws.append(ws)
+                sender_iters.append(iter(ws._has_what))
             elif ws_memory < mean_memory - half_gap and ws_memory < recipient_max:
                 # This may send the worker above recipient_max (by design)
                 rec_bytes_max = ws_memory - mean_memory  # negative
                 rec_bytes_min = rec_bytes_max + half_gap  # negative
                 # See definition of recipients above
-                recipients.append((rec_bytes_max, rec_bytes_min, id(ws), ws))
+                recipients.append((rec_bytes_max, rec_bytes_min, len(recipient_ws)))
+                recipient_ws.append(ws)
 
         # Fast exit in case no transfers are necessary or possible
         if not senders or not recipients:
@@ -6531,15 +6883,29 @@ class Scheduler(SchedulerState, ServerNode):
 
         snd_ws: WorkerState
         rec_ws: WorkerState
+        snd_bytes_max: Py_ssize_t
+        snd_bytes_min: Py_ssize_t
+        rec_bytes_max: Py_ssize_t
+        rec_bytes_min: Py_ssize_t
+        snd_idx: Py_ssize_t
+        rec_idx: Py_ssize_t
+        nbytes: Py_ssize_t
+        use_recipient: bint
+        replicated: bint
+        skipped_recipients: list
+        heappop = heapq.heappop
+        heappush = heapq.heappush
+        heapreplace = heapq.heapreplace
 
         while senders and recipients:
-            snd_bytes_max, snd_bytes_min, _, snd_ws, ts_iter = senders[0]
+            snd_bytes_max, snd_bytes_min, snd_idx = senders[0]
+            snd_ws = sender_ws[snd_idx]
 
             # Iterate through tasks in memory, least recently inserted first
-            for ts in ts_iter:
-                if keys is not None and ts.key not in keys:
+            for ts in sender_iters[snd_idx]:
+                if keys is not None and ts._key not in keys:
                     continue
-                nbytes = ts.nbytes
+                nbytes = ts._nbytes
                 if nbytes + snd_bytes_max > 0:
                     # Moving this task would cause the sender to go below mean and
                     # potentially risk becoming a recipient, which would cause tasks to
@@ -6553,18 +6919,21 @@ class Scheduler(SchedulerState, ServerNode):
                 # this task won't be moved.
                 skipped_recipients = []
                 use_recipient = False
+                # If the sender holds the only replica, no recipient can hold one
+                replicated = len(ts._who_has) > 1
                 while recipients and not use_recipient:
-                    rec_bytes_max, rec_bytes_min, _, rec_ws = recipients[0]
+                    rec_bytes_max, rec_bytes_min, rec_idx = recipients[0]
+                    rec_ws = recipient_ws[rec_idx]
                     if nbytes + rec_bytes_max > 0:
                         # recipients are sorted by rec_bytes_max.
                         # The next ones will be worse; no reason to continue iterating
                         break
-                    use_recipient = ts not in rec_ws._has_what
+                    use_recipient = not replicated or ts not in rec_ws._has_what
                     if not use_recipient:
-                        skipped_recipients.append(heapq.heappop(recipients))
+                        skipped_recipients.append(heappop(recipients))
 
                 for recipient in skipped_recipients:
-                    heapq.heappush(recipients, recipient)
+                    heappush(recipients, recipient)
 
                 if not use_recipient:
                     # This task has no recipients available. Leave it on the sender and
@@ -6585,31 +6954,25 @@ class Scheduler(SchedulerState, ServerNode):
                 # not come back on top again.
                 if snd_bytes_min < 0:
                     # See definition of senders above
-                    heapq.heapreplace(
-                        senders,
-                        (snd_bytes_max, snd_bytes_min, id(snd_ws), snd_ws, ts_iter),
-                    )
+                    heapreplace(senders, (snd_bytes_max, snd_bytes_min, snd_idx))
                 else:
-                    heapq.heappop(senders)
+                    heappop(senders)
 
                 # If recipient still has bytes to gain, push it back into the recipients
                 # heap; it may or may not come back on top again.
                 if rec_bytes_min < 0:
                     # See definition of recipients above
-                    heapq.heapreplace(
-                        recipients,
-                        (rec_bytes_max, rec_bytes_min, id(rec_ws), rec_ws),
-                    )
+                    heapreplace(recipients, (rec_bytes_max, rec_bytes_min, rec_idx))
                 else:
-                    heapq.heappop(recipients)
+                    heappop(recipients)
 
                 # Move to next sender with the most data to lose.
                 # It may or may not be the same sender again.
                 break
 
-            else:  # for ts in ts_iter
+            else:  # for ts in sender_iters[snd_idx]
                 # Exhausted tasks on this sender
-                heapq.heappop(senders)
+                heappop(senders)
 
         return msgs
 
@@ -6629,32 +6992,48 @@ class Scheduler(SchedulerState, ServerNode):
         rec_ws: WorkerState
         ts: TaskState
 
-        to_recipients: "defaultdict[str, defaultdict[str, list[str]]]" = defaultdict(
-            lambda: defaultdict(list)
-        )
+        # {recipient address: {key: [sender address, ...]}}
+        to_recipients: "dict[str, dict[str, list[str]]]" = {}
         for snd_ws, rec_ws, ts in msgs:
-            to_recipients[rec_ws.address][ts._key].append(snd_ws.address)
-        failed_keys_by_recipient = dict(
-            zip(
-                to_recipients,
-                await asyncio.gather(
-                    *(
-                        # Note: this never raises exceptions
-                        self.gather_on_worker(w, who_has)
-                        for w, who_has in to_recipients.items()
-                    )
-                ),
+            who_has = to_recipients.get(rec_ws._address)
+            if who_has is None:
+                who_has = to_recipients[rec_ws._address] = {}
+            snd_addrs = who_has.get(ts._key)
+            if snd_addrs is None:
+                who_has[ts._key] = [snd_ws._address]
+            else:
+                snd_addrs.append(snd_ws._address)
+        # {sender address: [keys successfully copied away from it]}
+        to_senders: "dict[str, list[str]]" = {}
+        stimulus_id = f"delete-data-{time()}"
+
+        async def move_to_recipient(rec_addr: str, who_has: dict) -> set:
+            """Copy keys to a recipient, then delete them from their senders as soon
+            as this recipient is done, without waiting for the other recipients
+            """
+            # Note: this never raises exceptions
+            failed_keys = await self.gather_on_worker(rec_addr, who_has)
+            done_by_sender: "dict[str, list[str]]" = {}
+            for key, snd_addrs in who_has.items():
+                if key in failed_keys:
+                    continue
+                for snd_addr in snd_addrs:
+                    done_by_sender.setdefault(snd_addr, []).append(key)
+                    to_senders.setdefault(snd_addr, []).append(key)
+            # Note: this never raises exceptions
+            await asyncio.gather(
+                *(
+                    self.delete_worker_data(snd_addr, keys, stimulus_id=stimulus_id)
+                    for snd_addr, keys in done_by_sender.items()
+                )
             )
-        )
-
-        to_senders = defaultdict(list)
-        for snd_ws, rec_ws, ts in msgs:
-            if ts._key not in failed_keys_by_recipient[rec_ws.address]:
-                to_senders[snd_ws.address].append(ts._key)
+            return failed_keys
 
-        # Note: this never raises exceptions
-        await asyncio.gather(
-            *(self.delete_worker_data(r, v) for r, v in to_senders.items())
+        failed_keys_by_recipient = await asyncio.gather(
+            *(
+                move_to_recipient(rec_addr, who_has)
+                for rec_addr, who_has in to_recipients.items()
+            )
         )
 
         for r, v in to_recipients.items():
@@ -6669,7 +7048,9 @@ class Scheduler(SchedulerState, ServerNode):
             },
         )
 
-        missing_keys = {k for r in failed_keys_by_recipient.values() for k in r}
+        missing_keys: set = set()
+        for r in failed_keys_by_recipient:
+            missing_keys.update(r)
         if missing_keys:
             return {"status": "partial-fail", "keys": list(missing_keys)}
         else:
@@ -6732,27 +7113,41 @@ class Scheduler(SchedulerState, ServerNode):
                 return {"status": "partial-fail", "keys": missing_data}
 
             # Delete extraneous data
+            deleting = None
             if delete:
-                del_worker_tasks = defaultdict(set)
+                del_worker_tasks: dict = {}
+                tss: set
                 for ts in tasks:
                     del_candidates = tuple(ts._who_has & workers)
                     if len(del_candidates) > n:
                         for ws in random.sample(
                             del_candidates, len(del_candidates) - n
                         ):
-                            del_worker_tasks[ws].add(ts)
-
+                            tss = del_worker_tasks.get(ws)
+                            if tss is None:
+                                del_worker_tasks[ws] = {ts}
+                            else:
+                                tss.add(ts)
+
+                # Tasks with extraneous replicas never need copying, so the
+                # deletions run concurrently with the copy rounds below.
                 # Note: this never raises exceptions
-                await asyncio.gather(
+                stimulus_id = f"delete-data-{time()}"
+                deleting = asyncio.gather(
                     *[
-                        self.delete_worker_data(ws._address, [t.key for t in tasks])
-                        for ws, tasks in del_worker_tasks.items()
+                        self.delete_worker_data(
+                            ws._address,
+                            [t._key for t in tss],
+                            stimulus_id=stimulus_id,
+                        )
+                        for ws, tss in del_worker_tasks.items()
                     ]
                 )
 
             # Copy not-yet-filled data
             while tasks:
-                gathers = defaultdict(dict)
+                gathers: dict = {}
+                workers_list = list(workers)
                 for ts in list(tasks):
                     if ts._state == "forgotten":
                         # task is no longer needed by any client or dependant task
@@ -6767,10 +7162,15 @@ class Scheduler(SchedulerState, ServerNode):
                     count = min(n_missing, branching_factor * len(ts._who_has))
                     assert count > 0
 
-                    for ws in random.sample(tuple(workers - ts._who_has), count):
-                        gathers[ws._address][ts._key] = [
-                            wws._address for wws in ts._who_has
-                        ]
+                    who_has = ts._who_has
+                    candidates = [ws for ws in workers_list if ws not in who_has]
+                    senders = [wws._address for wws in who_has]
+                    for ws in random.sample(candidates, count):
+                        who_has_by_key = gathers.get(ws._address)
+                        if who_has_by_key is None:
+                            gathers[ws._address] = {ts._key: senders}
+                        else:
+                            who_has_by_key[ts._key] = senders
 
                 await asyncio.gather(
                     *(
@@ -6782,6 +7182,9 @@ class Scheduler(SchedulerState, ServerNode):
                 for r, v in gathers.items():
                     self.log_event(r, {"action": "replicate-add", "who_has": v})
 
+            if deleting is not None:
+                await deleting
+
             self.log_event(
                 "all",
                 {
@@ -6872,7 +7275,7 @@ class Scheduler(SchedulerState, ServerNode):
 
         ws: WorkerState
         with log_errors():
-            if not n and all([ws._processing for ws in parent._workers_dv.values()]):
+            if not n and all(ws._processing for ws in parent._workers_dv.values()):
                 return []
 
             if key is None:
@@ -6884,28 +7287,37 @@ class Scheduler(SchedulerState, ServerNode):
 
             groups = groupby(key, parent._workers.values())
 
-            limit_bytes = {
-                k: sum([ws._memory_limit for ws in v]) for k, v in groups.items()
-            }
-            group_bytes = {k: sum([ws._nbytes for ws in v]) for k, v in groups.items()}
-
-            limit = sum(limit_bytes.values())
-            total = sum(group_bytes.values())
-
-            def _key(group):
-                wws: WorkerState
-                is_idle = not any([wws._processing for wws in groups[group]])
-                bytes = -group_bytes[group]
-                return (is_idle, bytes)
-
-            idle = sorted(groups, key=_key)
+            # Memory limit per group and its total, managed memory total, and the
+            # sort key of each group: busy groups first, then by decreasing memory
+            limit_bytes: dict = {}
+            sort_keys: dict = {}
+            group_limit: Py_ssize_t
+            group_nbytes: Py_ssize_t
+            is_idle: bint
+            limit: Py_ssize_t = 0
+            total: Py_ssize_t = 0
+            for k, v in groups.items():
+                group_limit = 0
+                group_nbytes = 0
+                is_idle = True
+                for ws in v:
+                    group_limit += ws._memory_limit
+                    group_nbytes += ws._nbytes
+                    if ws._processing:
+                        is_idle = False
+                limit_bytes[k] = group_limit
+                sort_keys[k] = (is_idle, -group_nbytes)
+                limit += group_limit
+                total += group_nbytes
+
+            idle = sorted(groups, key=sort_keys.__getitem__)
 
             to_close = []
             n_remain = len(parent._workers_dv)
 
             while idle:
                 group = idle.pop()
-                if n is None and any([ws._processing for ws in groups[group]]):
+                if n is None and not sort_keys[group][0]:
                     break
 
                 if minimum and n_remain - len(groups[group]) < minimum:
@@ -6986,12 +7398,14 @@ class Scheduler(SchedulerState, ServerNode):
                         logger.info("Retire worker names %s", names)
                     # Support cases where names are passed through a CLI and become
                     # strings
-                    names_set = {str(name) for name in names}
-                    wss = {
-                        ws
-                        for ws in parent._workers_dv.values()
-                        if str(ws._name) in names_set
-                    }
+                    addresses_by_name_str = self._addresses_by_name_str
+                    wss = set()
+                    for name in names:
+                        addresses = addresses_by_name_str.get(str(name))
+                        if addresses is not None:
+                            wss.update(
+                                [parent._workers_dv[address] for address in addresses]
+                            )
                 elif workers is not None:
                     wss = {
                         parent._workers_dv[address]
@@ -7015,11 +7429,15 @@ class Scheduler(SchedulerState, ServerNode):
                     stop_amm = True
 
                 try:
-                    coros = []
+                    # Set whenever any of the retirements may have completed; see
+                    # _track_retire_workers
+                    wake = asyncio.Event()
+                    retiring = {}
                     for ws in wss:
                         logger.info("Retiring worker %s", ws._address)
 
                         policy = RetireWorker(ws._address)
+                        policy.wake = wake
                         amm.add_policy(policy)
 
                         # Change Worker.status to closing_gracefully. Immediately set
@@ -7030,24 +7448,16 @@ class Scheduler(SchedulerState, ServerNode):
                         self.stream_comms[ws.address].send(
                             {"op": "worker-status-change", "status": ws.status.name}
                         )
-
-                        coros.append(
-                            self._track_retire_worker(
-                                ws,
-                                policy,
-                                prev_status=prev_status,
-                                close_workers=close_workers,
-                                remove=remove,
-                            )
-                        )
+                        retiring[ws] = policy, prev_status
 
                     # Give the AMM a kick, in addition to its periodic running. This is
                     # to avoid unnecessarily waiting for a potentially arbitrarily long
                     # time (depending on interval settings)
                     amm.run_once()
 
-                    workers_info = dict(await asyncio.gather(*coros))
-                    workers_info.pop(None, None)
+                    workers_info = await self._track_retire_workers(
+                        retiring, wake, close_workers=close_workers, remove=remove
+                    )
                 finally:
                     if stop_amm:
                         amm.stop()
@@ -7057,35 +7467,78 @@ class Scheduler(SchedulerState, ServerNode):
 
             return workers_info
 
-    async def _track_retire_worker(
+    async def _track_retire_workers(
         self,
-        ws: WorkerState,
-        policy: RetireWorker,
-        prev_status: Status,
+        retiring: dict,  # dict[WorkerState, tuple[RetireWorker, Status]]
+        wake: asyncio.Event,
         close_workers: bool,
         remove: bool,
-    ) -> tuple:  # tuple[str | None, dict]
+    ) -> dict:
+        """Wait for the RetireWorker policies of all workers being retired, closing
+        and removing the workers that are done in batches.
+
+        Workers whose policy finds no recipients revert to their previous status.
+        """
         parent: SchedulerState = cast(SchedulerState, self)
+        ws: WorkerState
+        workers_info: dict = {}
+        pending: dict = dict(retiring)
 
-        while not policy.done():
-            if policy.no_recipients:
-                # Abort retirement. This time we don't need to worry about race
-                # conditions and we can wait for a scheduler->worker->scheduler
-                # round-trip.
-                self.stream_comms[ws.address].send(
-                    {"op": "worker-status-change", "status": prev_status.name}
-                )
-                return None, {}
+        # Set by add_replica, remove_replica, and remove_worker whenever the worker's
+        # replicas change, and by the policies when they give up
+        for ws in pending:
+            parent._retiring[ws] = wake
+        try:
+            while pending:
+                done: list = []
+                for ws, (policy, prev_status) in list(pending.items()):
+                    if policy.done():
+                        logger.debug(
+                            "All unique keys on worker %s have been replicated "
+                            "elsewhere",
+                            ws._address,
+                        )
+                        done.append(ws)
+                    elif policy.no_recipients:
+                        # Abort retirement. This time we don't need to worry about
+                        # race conditions and we can wait for a
+                        # scheduler->worker->scheduler round-trip.
+                        self.stream_comms[ws.address].send(
+                            {"op": "worker-status-change", "status": prev_status.name}
+                        )
+                    else:
+                        continue
+                    del pending[ws]
+                    del parent._retiring[ws]
+
+                if done:
+                    workers_info.update(
+                        await asyncio.gather(
+                            *(
+                                self._close_retired_worker(ws, close_workers, remove)
+                                for ws in done
+                            )
+                        )
+                    )
+                    # Other retirements may have completed in the meantime
+                    continue
 
-            # Sleep 0.01s when there are 4 tasks or less
-            # Sleep 0.5s when there are 200 or more
-            poll_interval = max(0.01, min(0.5, len(ws.has_what) / 400))
-            await asyncio.sleep(poll_interval)
+                if pending:
+                    wake.clear()
+                    # The timeout is only a safety net; the event should always come
+                    # first
+                    with suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(wake.wait(), timeout=10)
+        finally:
+            for ws in pending:
+                del parent._retiring[ws]
 
-        logger.debug(
-            "All unique keys on worker %s have been replicated elsewhere", ws._address
-        )
+        return workers_info
 
+    async def _close_retired_worker(
+        self, ws: WorkerState, close_workers: bool, remove: bool
+    ) -> tuple:  # tuple[str, dict]
+        parent: SchedulerState = cast(SchedulerState, self)
         if close_workers and ws._address in parent._workers_dv:
             await self.close_worker(worker=ws._address, safe=True)
         if remove:
@@ -7105,15 +7558,22 @@ class Scheduler(SchedulerState, ServerNode):
         if worker not in parent._workers_dv:
             return "not found"
         ws: WorkerState = parent._workers_dv[worker]
+        tasks: dict = parent._tasks
+        ts: TaskState
+        # dict rather than list, in case keys contains duplicates
+        new_replicas: dict = {}
         redundant_replicas = []
         for key in keys:
-            ts: TaskState = parent._tasks.get(key)
+            ts = tasks.get(key)
             if ts is not None and ts._state == "memory":
                 if ws not in ts._who_has:
-                    parent.add_replica(ts, ws)
+                    new_replicas[ts] = None
             else:
                 redundant_replicas.append(key)
 
+        if new_replicas:
+            parent.add_replicas(list(new_replicas), ws)
+
         if redundant_replicas:
             if not stimulus_id:
                 stimulus_id = f"redundant-replicas-{time()}"
@@ -7162,9 +7622,8 @@ class Scheduler(SchedulerState, ServerNode):
                     ws: WorkerState = parent._workers_dv[w]
                     if ws not in ts._who_has:
                         parent.add_replica(ts, ws)
-                self.report(
-                    {"op": "key-in-memory", "key": key, "workers": list(workers)}
-                )
+
+            self.report_keys_in_memory(list(who_has))
 
             if client:
                 self.client_desires_keys(keys=list(who_has), client=client)
@@ -7217,13 +7676,25 @@ class Scheduler(SchedulerState, ServerNode):
             if inspect.isawaitable(state):
                 state = await state
             try:
+                # Sleep until a fixed deadline rather than for a fixed interval, so
+                # that the time spent in function and comm.write doesn't make the
+                # sampling period drift
+                deadline = time()
                 while self.status == Status.running:
                     if state is None:
                         response = function(self)
                     else:
                         response = function(self, state)
                     await comm.write(response)
-                    await asyncio.sleep(interval)
+                    deadline += interval
+                    delay = deadline - time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    else:
+                        # Fell behind; don't burst to catch up, but still yield to
+                        # the event loop
+                        deadline = time()
+                        await asyncio.sleep(0)
             except OSError:
                 pass
             finally:
@@ -7247,9 +7718,11 @@ class Scheduler(SchedulerState, ServerNode):
         ts: TaskState
         if workers is not None:
             workers = set(map(self.coerce_address, workers))
-            return {
-                w: [ts._key for ts in parent._workers_dv[w].processing] for w in workers
-            }
+            out: dict = {}
+            for w in workers:
+                ws = parent._workers_dv[w]
+                out[w] = [ts._key for ts in ws._processing]
+            return out
         else:
             return {
                 w: [ts._key for ts in ws._processing]
@@ -7261,12 +7734,12 @@ class Scheduler(SchedulerState, ServerNode):
         ws: WorkerState
         ts: TaskState
         if keys is not None:
-            return {
-                k: [ws._address for ws in parent._tasks[k].who_has]
-                if k in parent._tasks
-                else []
-                for k in keys
-            }
+            tasks: dict = parent._tasks
+            out: dict = {}
+            for k in keys:
+                ts = tasks.get(k)
+                out[k] = [ws._address for ws in ts._who_has] if ts is not None else []
+            return out
         else:
             return {
                 key: [ws._address for ws in ts._who_has]
@@ -7278,16 +7751,15 @@ class Scheduler(SchedulerState, ServerNode):
         ws: WorkerState
         ts: TaskState
         if workers is not None:
-            workers = map(self.coerce_address, workers)
-            return {
-                w: [ts._key for ts in parent._workers_dv[w].has_what]
-                if w in parent._workers_dv
-                else []
-                for w in workers
-            }
+            workers_dv: dict = parent._workers_dv
+            out: dict = {}
+            for w in map(self.coerce_address, workers):
+                ws = workers_dv.get(w)
+                out[w] = [ts._key for ts in ws._has_what] if ws is not None else []
+            return out
         else:
             return {
-                w: [ts._key for ts in ws.has_what]
+                w: [ts._key for ts in ws._has_what]
                 for w, ws in parent._workers_dv.items()
             }
 
@@ -7306,25 +7778,37 @@ class Scheduler(SchedulerState, ServerNode):
 
     def get_ncores_running(self, workers=None):
         parent: SchedulerState = cast(SchedulerState, self)
-        ncores = self.get_ncores(workers=workers)
-        return {
-            w: n
-            for w, n in ncores.items()
-            if parent._workers_dv[w].status == Status.running
-        }
+        ws: WorkerState
+        if workers is not None:
+            workers_dv: dict = parent._workers_dv
+            out: dict = {}
+            for w in map(self.coerce_address, workers):
+                ws = workers_dv.get(w)
+                if ws is not None and ws._status == Status.running:
+                    out[w] = ws._nthreads
+            return out
+        else:
+            return {
+                w: ws._nthreads
+                for w, ws in parent._workers_dv.items()
+                if ws._status == Status.running
+            }
 
     async def get_call_stack(self, keys=None):
         parent: SchedulerState = cast(SchedulerState, self)
         ts: TaskState
         dts: TaskState
         if keys is not None:
-            stack = list(keys)
+            stack = [parent._tasks[key] for key in keys]
+            seen = set(stack)
             processing = set()
             while stack:
-                key = stack.pop()
-                ts = parent._tasks[key]
+                ts = stack.pop()
                 if ts._state == "waiting":
-                    stack.extend([dts._key for dts in ts._dependencies])
+                    for dts in ts._dependencies:
+                        if dts not in seen:
+                            seen.add(dts)
+                            stack.append(dts)
                 elif ts._state == "processing":
                     processing.add(ts)
 
@@ -7355,21 +7839,29 @@ class Scheduler(SchedulerState, ServerNode):
             dictionaries mapping sizes to bandwidths.  These bandwidths are
             averaged over many workers running computations across the cluster.
         """
-        out: "dict[str, defaultdict[str, list[float]]]" = {
-            name: defaultdict(list) for name in ["disk", "memory", "network"]
+        # Running [total duration, count] per mode and size
+        totals: "dict[str, dict[str, list]]" = {
+            name: {} for name in ["disk", "memory", "network"]
         }
 
+        def accumulate(mode: str, durations: "Iterable[dict[str, float]]") -> None:
+            mode_totals = totals[mode]
+            for d in durations:
+                for size, duration in d.items():
+                    total = mode_totals.get(size)
+                    if total is None:
+                        mode_totals[size] = [duration, 1]
+                    else:
+                        total[0] += duration
+                        total[1] += 1
+
         # disk
         result = await self.broadcast(msg={"op": "benchmark_disk"})
-        for d in result.values():
-            for size, duration in d.items():
-                out["disk"][size].append(duration)
+        accumulate("disk", result.values())
 
         # memory
         result = await self.broadcast(msg={"op": "benchmark_memory"})
-        for d in result.values():
-            for size, duration in d.items():
-                out["memory"][size].append(duration)
+        accumulate("memory", result.values())
 
         # network
         workers = list(self.workers)
@@ -7384,17 +7876,12 @@ class Scheduler(SchedulerState, ServerNode):
         futures = [
             self.rpc(a).benchmark_network(address=b) for a, b in partition(2, workers)
         ]
-        responses = await asyncio.gather(*futures)
-
-        for d in responses:
-            for size, duration in d.items():
-                out["network"][size].append(duration)
+        accumulate("network", await asyncio.gather(*futures))
 
         result = {}
-        for mode in out:
+        for mode, mode_totals in totals.items():
             result[mode] = {
-                size: sum(durations) / len(durations)
-                for size, durations in out[mode].items()
+                size: total / count for size, (total, count) in mode_totals.items()
             }
 
         return result
@@ -7405,6 +7892,14 @@ class Scheduler(SchedulerState, ServerNode):
         with log_errors():
             if keys is not None:
                 result = {k: parent._tasks[k].nbytes for k in keys}
+            elif summary:
+                # Maintained incrementally by TaskState.set_nbytes and remove_key
+                tp: TaskPrefix
+                return {
+                    tp._name: tp._nbytes_known
+                    for tp in parent._task_prefixes.values()
+                    if tp._n_nbytes_known
+                }
             else:
                 result = {
                     k: ts._nbytes for k, ts in parent._tasks.items() if ts._nbytes >= 0
@@ -7468,31 +7963,41 @@ class Scheduler(SchedulerState, ServerNode):
             ts._worker_restrictions = set(restrictions)
 
     def get_task_prefix_states(self):
+        parent: SchedulerState = cast(SchedulerState, self)
+        tp: TaskPrefix
+        tg: TaskGroup
         with log_errors():
             state = {}
 
-            for tp in self.task_prefixes.values():
-                active_states = tp.active_states
-                if any(
-                    active_states.get(s)
-                    for s in {"memory", "erred", "released", "processing", "waiting"}
-                ):
-                    state[tp.name] = {
-                        "memory": active_states["memory"],
-                        "erred": active_states["erred"],
-                        "released": active_states["released"],
-                        "processing": active_states["processing"],
-                        "waiting": active_states["waiting"],
-                    }
+            for tp in parent._task_prefixes.values():
+                # Inactive groups have zero tasks in all of these states, so summing
+                # over all groups matches TaskPrefix.active_states without building
+                # the list of active groups and merging their state dicts
+                counts = {
+                    "memory": 0,
+                    "erred": 0,
+                    "released": 0,
+                    "processing": 0,
+                    "waiting": 0,
+                }
+                for tg in tp._groups:
+                    tg_states = tg._states
+                    for s in counts:
+                        counts[s] += tg_states[s]
+                if any(counts.values()):
+                    state[tp._name] = counts
 
         return state
 
     def get_task_status(self, keys=None):
         parent: SchedulerState = cast(SchedulerState, self)
-        return {
-            key: (parent._tasks[key].state if key in parent._tasks else None)
-            for key in keys
-        }
+        tasks: dict = parent._tasks
+        ts: TaskState
+        out: dict = {}
+        for key in keys:
+            ts = tasks.get(key)
+            out[key] = ts._state if ts is not None else None
+        return out
 
     def get_task_stream(self, start=None, stop=None, count=None):
         from distributed.diagnostics.task_stream import TaskStreamPlugin
@@ -7509,9 +8014,10 @@ class Scheduler(SchedulerState, ServerNode):
         self.add_plugin(plugin)
 
     def stop_task_metadata(self, name=None):
+        parent: SchedulerState = cast(SchedulerState, self)
         plugins = [
             p
-            for p in list(self.plugins.values())
+            for p in parent._plugins_tuple
             if isinstance(p, CollectTaskMetaDataPlugin) and p.name == name
         ]
         if len(plugins) != 1:
@@ -7669,6 +8175,9 @@ class Scheduler(SchedulerState, ServerNode):
         parent: SchedulerState = cast(SchedulerState, self)
         if addr in parent._aliases:
             addr = parent._aliases[addr]
+        if addr in parent._workers_dv:
+            # Already the canonical address of a known worker; skip resolution
+            return addr
         if isinstance(addr, tuple):
             addr = unparse_host_port(*addr)
         if not isinstance(addr, str):
@@ -7692,10 +8201,13 @@ class Scheduler(SchedulerState, ServerNode):
         if workers is None:
             return list(parent._workers)
 
+        host_info: dict = parent._host_info
         out = set()
         for w in workers:
             if ":" in w:
                 out.add(w)
+            elif w in host_info:
+                out.update(host_info[w]["addresses"])
             else:
                 out.update({ww for ww in parent._workers if w in ww})  # TODO: quadratic
         return list(out)
@@ -7733,21 +8245,30 @@ class Scheduler(SchedulerState, ServerNode):
         if scheduler:
             return profile.get_profile(self.io_loop.profile, start=start, stop=stop)
 
-        results = await asyncio.gather(
-            *(
-                self.rpc(w).profile(start=start, stop=stop, key=key, server=server)
-                for w in workers
-            ),
-            return_exceptions=True,
+        # Bound the number of connections opened at once, like broadcast does
+        sem = asyncio.Semaphore(
+            dask.config.get("distributed.scheduler.broadcast-concurrency")
         )
 
-        results = [r for r in results if not isinstance(r, Exception)]
+        async def get_one(w):
+            async with sem:
+                return await self.rpc(w).profile(
+                    start=start, stop=stop, key=key, server=server
+                )
+
+        workers = list(workers)
+        results = await asyncio.gather(
+            *(get_one(w) for w in workers), return_exceptions=True
+        )
+        # Skip workers that failed to respond
+        responses = {
+            w: r for w, r in zip(workers, results) if not isinstance(r, Exception)
+        }
 
         if merge_workers:
-            response = profile.merge(*results)
+            return profile.merge(*responses.values())
         else:
-            response = dict(zip(workers, results))
-        return response
+            return responses
 
     async def get_profile_metadata(
         self,
@@ -7766,11 +8287,18 @@ class Scheduler(SchedulerState, ServerNode):
             workers = parent._workers_dv
         else:
             workers = set(parent._workers_dv) & set(workers)
-        results = await asyncio.gather(
-            *(self.rpc(w).profile_metadata(start=start, stop=stop) for w in workers),
-            return_exceptions=True,
+        # Bound the number of connections opened at once, like broadcast does
+        sem = asyncio.Semaphore(
+            dask.config.get("distributed.scheduler.broadcast-concurrency")
         )
 
+        async def get_one(w):
+            async with sem:
+                return await self.rpc(w).profile_metadata(start=start, stop=stop)
+
+        results = await asyncio.gather(
+            *(get_one(w) for w in workers), return_exceptions=True
+        )
         results = [r for r in results if not isinstance(r, Exception)]
         counts = [
             (time, sum(pluck(1, group)))
@@ -7785,17 +8313,15 @@ class Scheduler(SchedulerState, ServerNode):
         keys: dict[str, list[list]] = {
             k: [] for v in results for t, d in v["keys"] for k in d
         }
-
-        groups1 = [v["keys"] for v in results]
-        groups2 = list(merge_sorted(*groups1, key=first))
+        key_series = keys.values()
 
         last = 0
-        for t, d in groups2:
+        for t, d in merge_sorted(*(v["keys"] for v in results), key=first):
             tt = t // dt * dt
             if tt > last:
                 last = tt
-                for k, v in keys.items():
-                    v.append([tt, 0])
+                for series in key_series:
+                    series.append([tt, 0])
             for k, v in d.items():
                 keys[k][-1][1] += v
 
@@ -7821,8 +8347,14 @@ class Scheduler(SchedulerState, ServerNode):
             figure, source = profile.plot_figure(data, sizing_mode="stretch_both")
             return figure
 
-        compute, scheduler, workers = map(
-            profile_to_figure, (compute, scheduler, workers)
+        # Building the figures only reads the (freshly merged) profile states, so it
+        # can happen off the event loop. The bokeh components below read live
+        # scheduler state and must stay on it.
+        compute, scheduler, workers = await asyncio.gather(
+            *(
+                offload(profile_to_figure, state)
+                for state in (compute, scheduler, workers)
+            )
         )
 
         # Task stream
@@ -7951,23 +8483,27 @@ class Scheduler(SchedulerState, ServerNode):
             ]
         )
 
-        from bokeh.core.templates import get_env
-        from bokeh.plotting import output_file, save
-
-        with tmpfile(extension=".html") as fn:
-            output_file(filename=fn, title="Dask Performance Report", mode=mode)
-            template_directory = os.path.join(
-                os.path.dirname(os.path.abspath(__file__)), "dashboard", "templates"
-            )
-            template_environment = get_env()
-            template_environment.loader.searchpath.append(template_directory)
-            template = template_environment.get_template("performance_report.html")
-            save(tabs, filename=fn, template=template)
+        from bokeh.plotting import save
+        from bokeh.resources import Resources
+
+        def render():
+            with tmpfile(extension=".html") as fn:
+                # Pass resources and title to save() rather than calling
+                # output_file(), which sets Bokeh's process-wide output state
+                save(
+                    tabs,
+                    filename=fn,
+                    resources=Resources(mode=mode),
+                    title="Dask Performance Report",
+                    template=_performance_report_template(),
+                )
 
-            with open(fn) as f:
-                data = f.read()
+                with open(fn) as f:
+                    return f.read()
 
-        return data
+        # The models above are complete snapshots, so rendering them to HTML
+        # (the expensive part) doesn't need the event loop
+        return await offload(render)
 
     async def get_worker_logs(self, n=None, workers=None, nanny=False):
         results = await self.broadcast(
@@ -7977,32 +8513,39 @@ class Scheduler(SchedulerState, ServerNode):
 
     def log_event(self, name, msg):
         event = (time(), msg)
-        if isinstance(name, (list, tuple)):
-            for n in name:
-                self.events[n].append(event)
-                self.event_counts[n] += 1
+        if not isinstance(name, (list, tuple)):
+            name = (name,)
+        events = self.events
+        event_counts = self.event_counts
+        event_subscriber = self.event_subscriber
+        for n in name:
+            events[n].append(event)
+            event_counts[n] += 1
+            if n in event_subscriber:
                 self._report_event(n, event)
-        else:
-            self.events[name].append(event)
-            self.event_counts[name] += 1
-            self._report_event(name, event)
 
     def _report_event(self, name, event):
-        for client in self.event_subscriber[name]:
-            self.report(
-                {
-                    "op": "event",
-                    "topic": name,
-                    "event": event,
-                },
-                client=client,
-            )
+        subscribers = self.event_subscriber.get(name)
+        if not subscribers:
+            return
+        msg = {
+            "op": "event",
+            "topic": name,
+            "event": event,
+        }
+        for client in subscribers:
+            self.client_send(client, msg)
 
     def subscribe_topic(self, topic, client):
         self.event_subscriber[topic].add(client)
 
     def unsubscribe_topic(self, topic, client):
-        self.event_subscriber[topic].discard(client)
+        subscribers = self.event_subscriber.get(topic)
+        if subscribers is not None:
+            subscribers.discard(client)
+            # Drop the topic once nobody listens, so log_event skips it again
+            if not subscribers:
+                del self.event_subscriber[topic]
 
     def get_events(self, topic=None):
         if topic is not None:
@@ -8014,13 +8557,21 @@ class Scheduler(SchedulerState, ServerNode):
         parent: SchedulerState = cast(SchedulerState, self)
         if starts is None:
             starts = {}
-        results = await asyncio.gather(
-            *(
-                self.rpc(w).get_monitor_info(recent=recent, start=starts.get(w, 0))
-                for w in parent._workers_dv
-            )
+        # Each worker gets its own start offset, so this can't go through
+        # broadcast; bound the fan-out with the same limit instead
+        sem = asyncio.Semaphore(
+            dask.config.get("distributed.scheduler.broadcast-concurrency")
         )
-        return dict(zip(parent._workers_dv, results))
+
+        async def get_one(w):
+            async with sem:
+                return await self.rpc(w).get_monitor_info(
+                    recent=recent, start=starts.get(w, 0)
+                )
+
+        workers = list(parent._workers_dv)
+        results = await asyncio.gather(*(get_one(w) for w in workers))
+        return dict(zip(workers, results))
 
     ###########
     # Cleanup #
@@ -8046,9 +8597,21 @@ class Scheduler(SchedulerState, ServerNode):
             if self.status == Status.closed:
                 return
             last = time()
-            next_time = timedelta(seconds=0.1)
+            # 100ms on small clusters, backing off like worker heartbeats on
+            # larger ones
+            next_time = timedelta(
+                seconds=heartbeat_interval(len(parent._workers_dv)) / 5
+            )
 
-            if self.proc.cpu_percent() < 50:
+            # This runs as often as every 100ms; sampling /proc that often is
+            # wasteful, and cpu_percent() is more meaningful over a longer
+            # window, so refresh the sample at most every 0.5s
+            cpu_percent, sampled = self._cpu_percent_sample
+            if last - sampled > 0.5:
+                cpu_percent = self.proc.cpu_percent()
+                self._cpu_percent_sample = (cpu_percent, last)
+
+            if cpu_percent < 50:
                 workers: list = list(parent._workers.values())
                 nworkers: Py_ssize_t = len(workers)
                 i: Py_ssize_t
@@ -8078,25 +8641,49 @@ class Scheduler(SchedulerState, ServerNode):
     async def check_worker_ttl(self):
         parent: SchedulerState = cast(SchedulerState, self)
         ws: WorkerState
+        cutoff: double = time() - max(self.worker_ttl, 10 * self._heartbeat_interval)
+        # Collect first; remove_worker yields to the event loop and changes the dict
+        to_remove: list = [
+            ws for ws in parent._workers_dv.values() if ws._last_seen < cutoff
+        ]
+        for ws in to_remove:
+            logger.warning(
+                "Worker failed to heartbeat within %s seconds. Closing: %s",
+                self.worker_ttl,
+                ws,
+            )
+            await self.remove_worker(address=ws._address)
+
+    def _clear_events(self):
+        """Drop the events of workers and clients that were removed more than
+        ``distributed.scheduler.events-cleanup-delay`` ago and haven't come back
+        """
+        parent: SchedulerState = cast(SchedulerState, self)
+        pending: dict = self._events_pending_cleanup
+        if not pending:
+            return
         now = time()
-        for ws in parent._workers_dv.values():
-            if (ws._last_seen < now - self.worker_ttl) and (
-                ws._last_seen < now - 10 * heartbeat_interval(len(parent._workers_dv))
+        for name, deadline in list(pending.items()):
+            if deadline > now:
+                continue
+            del pending[name]
+            if (
+                name not in parent._workers_dv
+                and name not in parent._clients
+                and name in self.events
             ):
-                logger.warning(
-                    "Worker failed to heartbeat within %s seconds. Closing: %s",
-                    self.worker_ttl,
-                    ws,
-                )
-                await self.remove_worker(address=ws._address)
+                del self.events[name]
 
     def check_idle(self):
         parent: SchedulerState = cast(SchedulerState, self)
         ws: WorkerState
-        if (
-            any([ws._processing for ws in parent._workers_dv.values()])
-            or parent._unrunnable
-        ):
+        busy: bint = bool(parent._unrunnable)
+        if not busy:
+            for ws in parent._workers_dv.values():
+                if ws._processing:
+                    busy = True
+                    break
+        if busy:
             self.idle_since = None
             return
         elif not self.idle_since:
@@ -8135,23 +8722,26 @@ class Scheduler(SchedulerState, ServerNode):
             parent._total_occupancy / target_duration
         )  # TODO: threads per worker
 
-        # Avoid a few long tasks from asking for many cores
+        # Count processing tasks and total memory in a single pass over the
+        # workers; tasks are only counted until they exceed the CPU target
         ws: WorkerState
-        tasks_processing = 0
+        tasks_processing: Py_ssize_t = 0
+        limit: Py_ssize_t = 0
+        used: Py_ssize_t = 0
         for ws in parent._workers_dv.values():
-            tasks_processing += len(ws._processing)
+            if tasks_processing <= cpu:
+                tasks_processing += len(ws._processing)
+            limit += ws._memory_limit
+            used += ws._nbytes
 
-            if tasks_processing > cpu:
-                break
-        else:
-            cpu = min(tasks_processing, cpu)
+        # Avoid a few long tasks from asking for many cores
+        if tasks_processing <= cpu:
+            cpu = tasks_processing
 
         if parent._unrunnable and not parent._workers_dv:
             cpu = max(1, cpu)
 
         # add more workers if more than 60% of memory is used
-        limit = sum([ws._memory_limit for ws in parent._workers_dv.values()])
-        used = sum([ws._nbytes for ws in parent._workers_dv.values()])
         memory = 0
         if used > 0.6 * limit and limit > 0:
             memory = 2 * len(parent._workers_dv)
@@ -8172,9 +8762,10 @@ class Scheduler(SchedulerState, ServerNode):
         ws: WorkerState
         ts: TaskState
 
-        who_has = {}
+        tasks: dict = parent._tasks
+        who_has: dict = {}
         for key in keys:
-            ts = parent._tasks[key]
+            ts = tasks[key]
             who_has[key] = {ws._address for ws in ts._who_has}
 
         self.stream_comms[addr].send(
@@ -8199,17 +8790,18 @@ class Scheduler(SchedulerState, ServerNode):
         """
         parent: SchedulerState = cast(SchedulerState, self)
         ws: WorkerState = parent._workers_dv[addr]
-        validate = self.validate
+        tasks: dict = parent._tasks
+        tss: list = [tasks[key] for key in keys]
+        ts: TaskState
+        if parent._validate:
+            for ts in tss:
+                # Do not destroy the last copy
+                assert len(ts._who_has) > 1
 
         # The scheduler immediately forgets about the replica and suggests the worker to
         # drop it. The worker may refuse, at which point it will send back an add-keys
         # message to reinstate it.
-        for key in keys:
-            ts: TaskState = parent._tasks[key]
-            if validate:
-                # Do not destroy the last copy
-                assert len(ts._who_has) > 1
-            self.remove_replica(ts, ws)
+        parent.remove_replicas(tss, ws)
 
         self.stream_comms[addr].send(
             {
@@ -8220,6 +8812,93 @@ class Scheduler(SchedulerState, ServerNode):
         )
 
 
+@cfunc
+@exceptval(check=False)
+def _assign_priorities(
+    touched_tasks: list,
+    priority: dict,
+    user_priority: dict,
+    generation,
+    default_generation,
+) -> list:
+    """
+    Give the tasks touched by ``update_graph`` that don't have a priority yet
+    their ``(-user_priority, generation, order)`` priority, and return those
+    that are runnable.
+    """
+    ts: TaskState
+    runnables: list = []
+    for ts in touched_tasks:
+        if ts._priority is None:
+            key = ts._key
+            order = priority.get(key)
+            if order is not None:
+                ts._priority = (-(user_priority.get(key, 0)), generation, order)
+        if ts._run_spec:
+            runnables.append(ts)
+            if ts._priority is None:
+                ts._priority = (default_generation, 0)
+    return runnables
+
+
+@cfunc
+@exceptval(check=False)
+def _update_bandwidths(
+    state: SchedulerState,
+    address: str,
+    bandwidth_metrics: dict,
+    bandwidth_workers,
+    bandwidth_types,
+):
+    """
+    Fold the bandwidth measurements of a worker heartbeat into the exponentially
+    weighted averages kept by the scheduler.
+    """
+    frac: double = 1 / len(state._workers_dv)
+    decay: double = 1 - frac
+    alpha: double
+    state._bandwidth = state._bandwidth * decay + bandwidth_metrics["total"] * frac
+
+    for other, (bw, count) in bandwidth_metrics["workers"].items():
+        pair = (address, other)
+        prev = bandwidth_workers.get(pair)
+        if prev is None:
+            bandwidth_workers[pair] = bw / count
+        else:
+            alpha = decay**count
+            bandwidth_workers[pair] = prev * alpha + bw * (1 - alpha)
+
+    for typ, (bw, count) in bandwidth_metrics["types"].items():
+        prev = bandwidth_types.get(typ)
+        if prev is None:
+            bandwidth_types[typ] = bw / count
+        else:
+            alpha = decay**count
+            bandwidth_types[typ] = prev * alpha + bw * (1 - alpha)
+
+
+@cfunc
+@exceptval(check=False)
+def _update_memory_unmanaged_old(
+    state: SchedulerState, ws: WorkerState, now: double, size
+):
+    """
+    Record a new sample of unmanaged memory on *ws* and update
+    ``ws._memory_unmanaged_old`` to the minimum over the recent-to-old window.
+    """
+    history = ws._memory_other_history
+    max_age: double = now - state.MEMORY_RECENT_TO_OLD_TIME
+    while history and history[0][0] < max_age:
+        history.popleft()
+
+    # Keep the history sorted by size: any older sample that is not smaller than
+    # the new one can never be the minimum again, as it will expire first.
+    while history and history[-1][1] >= size:
+        history.pop()
+    history.append((now, size))
+    ws._memory_unmanaged_old = history[0][1]
+
+
 @cfunc
 @exceptval(check=False)
 def _remove_from_processing(
@@ -8270,18 +8949,21 @@ def _add_to_memory(
 
     state.add_replica(ts, ws)
 
-    deps: list = list(ts._dependents)
-    if len(deps) > 1:
-        deps.sort(key=operator.attrgetter("priority"), reverse=True)
-
+    # Only the dependents that become ready here need recommending, in priority
+    # order; sort just those rather than every dependent
+    ready: list = []
     dts: TaskState
     s: set
-    for dts in deps:
+    for dts in ts._dependents:
         s = dts._waiting_on
         if ts in s:
             s.discard(ts)
             if not s:  # new task ready to run
-                recommendations[dts._key] = "processing"
+                ready.append(dts)
+    if len(ready) > 1:
+        ready.sort(key=operator.attrgetter("priority"), reverse=True)
+    for dts in ready:
+        recommendations[dts._key] = "processing"
 
     for dts in ts._dependencies:
         s = dts._waiters
@@ -8306,8 +8988,8 @@ def _add_to_memory(
     ts._type = typename  # type: ignore
     ts._group._types.add(typename)
 
-    cs = state._clients["fire-and-forget"]
-    if ts in cs._wants_what:
+    cs = state._fire_and_forget
+    if cs._wants_what and ts in cs._wants_what:
         _client_releases_keys(
             state,
             cs=cs,
@@ -8345,16 +9027,17 @@ def _propagate_forgotten(
     ts._waiting_on.clear()
 
     ws: WorkerState
-    for ws in ts._who_has:
-        w: str = ws._address
-        if w in state._workers_dv:  # in case worker has died
-            worker_msgs[w] = [
-                {
-                    "op": "free-keys",
-                    "keys": [key],
-                    "stimulus_id": f"propagate-forgotten-{time()}",
-                }
-            ]
+    if ts._who_has:
+        # One message, and one timestamp, shared by every worker holding the key
+        worker_msg: dict = {
+            "op": "free-keys",
+            "keys": [key],
+            "stimulus_id": f"propagate-forgotten-{time()}",
+        }
+        for ws in ts._who_has:
+            w: str = ws._address
+            if w in state._workers_dv:  # in case worker has died
+                worker_msgs[w] = [worker_msg]
     state.remove_all_replicas(ts)
 
 
@@ -8405,13 +9088,17 @@ def _task_to_msg(state: SchedulerState, ts: TaskState, duration: double = -1) ->
 
     deps: set = ts._dependencies
     if deps:
-        msg["who_has"] = {
-            dts._key: [ws._address for ws in dts._who_has] for dts in deps
-        }
-        msg["nbytes"] = {dts._key: dts._nbytes for dts in deps}
+        # Build who_has and nbytes in a single pass over the dependencies
+        who_has: dict = {}
+        nbytes: dict = {}
+        for dts in deps:
+            who_has[dts._key] = [ws._address for ws in dts._who_has]
+            nbytes[dts._key] = dts._nbytes
+        msg["who_has"] = who_has
+        msg["nbytes"] = nbytes
 
         if state._validate:
-            assert all(msg["who_has"].values())
+            assert all(who_has.values())
 
     task = ts._run_spec
     if type(task) is dict:
@@ -8428,11 +9115,13 @@ def _task_to_msg(state: SchedulerState, ts: TaskState, duration: double = -1) ->
 @cfunc
 @exceptval(check=False)
 def _task_to_report_msg(state: SchedulerState, ts: TaskState) -> dict:  # -> dict | None
-    if ts._state == "forgotten":
-        return {"op": "cancelled-key", "key": ts._key}
-    elif ts._state == "memory":
+    # Most reports are for keys landing in memory; test that first
+    task_state: str = ts._state
+    if task_state == "memory":
         return {"op": "key-in-memory", "key": ts._key}
-    elif ts._state == "erred":
+    elif task_state == "forgotten":
+        return {"op": "cancelled-key", "key": ts._key}
+    elif task_state == "erred":
         failing_ts: TaskState = ts._exception_blame
         return {
             "op": "task-erred",
@@ -8476,15 +9165,19 @@ def decide_worker(
     *objective* function.
     """
     ws: WorkerState = None  # type: ignore
-    wws: WorkerState
     dts: TaskState
     deps: set = ts._dependencies
     candidates: set
-    assert all([dts._who_has for dts in deps])
     if ts._actor:
+        assert all([dts._who_has for dts in deps])
         candidates = set(all_workers)
     else:
-        candidates = {wws for dts in deps for wws in dts._who_has}
+        # Union the holders of each dependency in one pass, checking as we go
+        # that every dependency is held somewhere
+        candidates = set()
+        for dts in deps:
+            assert dts._who_has
+            candidates.update(dts._who_has)
     if valid_workers is None:
         if not candidates:
             candidates = set(all_workers)
@@ -8514,8 +9207,9 @@ def validate_task_state(ts: TaskState):
     """
     ws: WorkerState
     dts: TaskState
+    state: str = ts._state
 
-    assert ts._state in ALL_TASK_STATES or ts._state == "forgotten", ts
+    assert state in ALL_TASK_STATES or state == "forgotten", ts
 
     if ts._waiting_on:
         assert ts._waiting_on.issubset(ts._dependencies), (
@@ -8533,6 +9227,7 @@ def validate_task_state(ts: TaskState):
     for dts in ts._waiting_on:
         assert not dts._who_has, ("waiting on in-memory dep", str(ts), str(dts))
         assert dts._state != "released", ("waiting on released dep", str(ts), str(dts))
+    in_play: bint = state in ("waiting", "processing")
     for dts in ts._dependencies:
         assert ts in dts._dependents, (
             "not in dependency's dependents",
@@ -8540,7 +9235,7 @@ def validate_task_state(ts: TaskState):
             str(dts),
             str(dts._dependents),
         )
-        if ts._state in ("waiting", "processing"):
+        if in_play:
             assert dts in ts._waiting_on or dts._who_has, (
                 "dep missing",
                 str(ts),
@@ -8563,15 +9258,16 @@ def validate_task_state(ts: TaskState):
         )
         assert dts._state != "forgotten"
 
-    assert (ts._processing_on is not None) == (ts._state == "processing")
-    assert bool(ts._who_has) == (ts._state == "memory"), (ts, ts._who_has, ts._state)
+    assert (ts._processing_on is not None) == (state == "processing")
+    assert bool(ts._who_has) == (state == "memory"), (ts, ts._who_has, state)
 
-    if ts._state == "processing":
-        assert all([dts._who_has for dts in ts._dependencies]), (
-            "task processing without all deps",
-            str(ts),
-            str(ts._dependencies),
-        )
+    if state == "processing":
+        for dts in ts._dependencies:
+            assert dts._who_has, (
+                "task processing without all deps",
+                str(ts),
+                str(ts._dependencies),
+            )
         assert not ts._waiting_on
 
     if ts._who_has:
@@ -8583,7 +9279,8 @@ def validate_task_state(ts: TaskState):
         if ts._run_spec:  # was computed
             assert ts._type
             assert isinstance(ts._type, str)
-        assert not any([ts in dts._waiting_on for dts in ts._dependents])
+        for dts in ts._dependents:
+            assert ts not in dts._waiting_on
         for ws in ts._who_has:
             assert ts in ws._has_what, (
                 "not in who_has' has_what",
@@ -8603,9 +9300,9 @@ def validate_task_state(ts: TaskState):
             )
 
     if ts._actor:
-        if ts._state == "memory":
+        if state == "memory":
             assert sum([ts in ws._actors for ws in ts._who_has]) == 1
-        if ts._state == "processing":
+        if state == "processing":
             assert ts in ts._processing_on.actors
 
 
@@ -8649,6 +9346,25 @@ def validate_state(tasks, workers, clients):
             )
 
 
+@lru_cache(maxsize=32)
+def _parse_fifo_timeout(fifo_timeout) -> float:
+    """``parse_timedelta``, cached for the few distinct values clients send"""
+    return parse_timedelta(fifo_timeout)
+
+
+@lru_cache(maxsize=1)
+def _performance_report_template():
+    """The compiled Jinja template for performance reports, loaded once"""
+    from bokeh.core.templates import get_env
+
+    template_directory = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "dashboard", "templates"
+    )
+    template_environment = get_env()
+    template_environment.loader.searchpath.append(template_directory)
+    return template_environment.get_template("performance_report.html")
+
+
 def heartbeat_interval(n):
     """
     Interval in seconds that we desire heartbeats based on number of workers
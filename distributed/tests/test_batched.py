@@ -79,6 +79,22 @@ async def test_send_before_start():
         assert result == ("hello", "world")
 
 
+@pytest.mark.asyncio
+async def test_extend():
+    async with EchoServer() as e:
+        comm = await connect(e.address)
+
+        b = BatchedSend(interval=10)
+
+        b.send("hello")
+        b.extend(["world", "!"])
+        assert b.message_count == 3
+
+        b.start(comm)
+        result = await comm.read()
+        assert result == ("hello", "world", "!")
+
+
 @pytest.mark.asyncio
 async def test_send_after_stream_start():
     async with EchoServer() as e:
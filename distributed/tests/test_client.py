@@ -1312,6 +1312,18 @@ async def test_get_nbytes(c, s, a, b):
     await y
 
     assert s.get_nbytes(summary=False) == {x.key: sizeof(1), y.key: sizeof(2)}
+    assert s.get_nbytes(summary=True) == {"inc": sizeof(2), "int": sizeof(1)}
+
+    del y
+    while "inc" in s.get_nbytes(summary=True):
+        await asyncio.sleep(0.01)
+    assert s.get_nbytes(summary=True) == {"int": sizeof(1)}
+
+    # The nbytes setter keeps the per-prefix summary in sync
+    ts = s.tasks[x.key]
+    ts.nbytes = 123
+    assert s.get_nbytes(summary=True) == {"int": 123}
+    ts.nbytes = sizeof(1)
 
 
 @pytest.mark.skipif(not LINUX, reason="Need 127.0.0.2 to mean localhost")
@@ -7174,6 +7186,32 @@ async def test_events_subscribe_topic(c, s, a):
     assert len(all_events) == 3
 
 
+@gen_cluster(client=True, nthreads=[])
+async def test_events_only_sent_to_subscribers(c, s):
+    log = []
+    c.subscribe_topic("test-topic", log.append)
+
+    async with Client(s.address, asynchronous=True) as c2:
+        while not s.event_subscriber["test-topic"]:
+            await asyncio.sleep(0.01)
+
+        sent = []
+        bcomm = s.client_comms[c2.id]
+        original_send = bcomm.send
+
+        def send(*msgs):
+            sent.extend(msgs)
+            return original_send(*msgs)
+
+        bcomm.send = send
+        s.log_event("test-topic", "scheduler")
+
+        while not log:
+            await asyncio.sleep(0.01)
+
+        assert not [msg for msg in sent if msg["op"] == "event"]
+
+
 @gen_cluster(client=True, nthreads=[("", 1)])
 async def test_events_subscribe_topic_cancelled(c, s, a):
     event_handler_started = asyncio.Event()
@@ -16,8 +16,14 @@ import psutil
 import pytest
 from tlz import concat, first, frequencies, merge, valmap
 
+try:
+    import bokeh
+except ImportError:
+    bokeh = None  # type: ignore
+
 import dask
 from dask import delayed
+from dask.sizeof import sizeof
 from dask.utils import apply, parse_timedelta, stringify, tmpfile, typename
 
 from distributed import (
@@ -52,6 +58,7 @@ from distributed.utils_test import (
     varying,
 )
 from distributed.worker import dumps_function, dumps_task, get_worker
+from distributed.worker_state_machine import TaskState as WorkerTaskState
 
 pytestmark = pytest.mark.ci1
 
@@ -313,6 +320,43 @@ async def test_remove_client(s, a, b):
     assert not s.dependencies
 
 
+@gen_cluster(client=True, nthreads=[])
+async def test_update_graph_cancels_tasks_on_lost_data(c, s):
+    n = 10
+    tasks = {"x-0": dumps_task((inc, "lost"))}
+    dependencies = {"x-0": {"lost"}}
+    for i in range(1, n):
+        tasks[f"x-{i}"] = dumps_task((inc, f"x-{i - 1}"))
+        dependencies[f"x-{i}"] = {f"x-{i - 1}"}
+    tasks["y"] = dumps_task((inc, 1))
+    dependencies["y"] = set()
+
+    s.update_graph(
+        tasks=tasks,
+        keys=[f"x-{n - 1}", "y"],
+        dependencies=dependencies,
+        client=c.id,
+    )
+    assert set(s.tasks) == {"y"}
+    assert s.clients[c.id].wants_what == {s.tasks["y"]}
+
+
+@gen_cluster(client=True, nthreads=[])
+async def test_cancel_key_diamond(c, s):
+    x = c.submit(inc, 1, key="x")
+    ys = [c.submit(operator.add, x, i, key=f"y-{i}") for i in range(10)]
+    z = c.submit(sum, ys, key="z")
+    while len(s.tasks) < 12:
+        await asyncio.sleep(0.01)
+
+    s.cancel_key("x", c.id)
+    while s.tasks:
+        await asyncio.sleep(0.01)
+    while not z.cancelled():
+        await asyncio.sleep(0.01)
+    assert all(y.cancelled() for y in ys)
+
+
 @gen_cluster()
 async def test_server_listens_to_other_ops(s, a, b):
     with rpc(s.address) as r:
@@ -321,6 +365,16 @@ async def test_server_listens_to_other_ops(s, a, b):
         assert ident["id"].lower().startswith("scheduler")
 
 
+@gen_cluster()
+async def test_identity_n_workers(s, a, b):
+    assert s.identity()["workers"].keys() == {a.address, b.address}
+    assert len(s.identity(n_workers=1)["workers"]) == 1
+    assert s.identity(n_workers=0)["workers"] == {}
+    with rpc(s.address) as r:
+        ident = await r.identity(n_workers=1)
+        assert len(ident["workers"]) == 1
+
+
 @gen_cluster()
 async def test_remove_worker_from_scheduler(s, a, b):
     dsk = {("x-%d" % i): (inc, i) for i in range(20)}
@@ -649,6 +703,48 @@ async def test_broadcast(s, a, b):
     assert result == {a.address: b"pong", b.address: b"pong"}
 
 
+@gen_cluster(
+    nthreads=[("", 1)] * 3,
+    config={"distributed.scheduler.broadcast-concurrency": 1},
+)
+async def test_broadcast_concurrency(s, *workers):
+    connecting = 0
+    max_connecting = 0
+    connect = s.rpc.connect
+
+    async def counting_connect(addr, *args, **kwargs):
+        nonlocal connecting, max_connecting
+        connecting += 1
+        max_connecting = max(max_connecting, connecting)
+        try:
+            return await connect(addr, *args, **kwargs)
+        finally:
+            connecting -= 1
+
+    s.rpc.connect = counting_connect
+
+    result = await s.broadcast(msg={"op": "ping"})
+    assert result == {w.address: b"pong" for w in workers}
+    assert max_connecting == 1
+
+    # Only connecting is bounded; handlers that wait for each other still finish
+    arrived = set()
+
+    def make_barrier(addr):
+        async def barrier():
+            arrived.add(addr)
+            while len(arrived) < len(workers):
+                await asyncio.sleep(0.01)
+            return "done"
+
+        return barrier
+
+    for w in workers:
+        w.handlers["barrier"] = make_barrier(w.address)
+    result = await s.broadcast(msg={"op": "barrier"})
+    assert result == {w.address: "done" for w in workers}
+
+
 @gen_cluster(security=tls_only_security())
 async def test_broadcast_tls(s, a, b):
     result = await s.broadcast(msg={"op": "ping"})
@@ -753,6 +849,16 @@ async def test_coerce_address(s):
     await asyncio.gather(a.close(), b.close(), c.close())
 
 
+@gen_cluster()
+async def test_workers_list(s, a, b):
+    assert s.workers_list(None) == list(s.workers)
+    assert sorted(s.workers_list(["127.0.0.1"])) == sorted([a.address, b.address])
+    assert s.workers_list([a.address]) == [a.address]
+    # Partial hostnames fall back to substring matching
+    assert sorted(s.workers_list(["127.0.0"])) == sorted([a.address, b.address])
+    assert s.workers_list(["127.0.0.2"]) == []
+
+
 @gen_cluster(nthreads=[], config={"distributed.scheduler.work-stealing": True})
 async def test_config_stealing(s):
     """Regression test for https://github.com/dask/distributed/issues/3409"""
@@ -1409,6 +1515,52 @@ async def test_profile_metadata_keys(c, s, a, b):
     )
 
 
+@gen_cluster()
+async def test_get_profile_skips_failed_workers(s, a, b):
+    def raise_timeout(*args, **kwargs):
+        raise TimeoutError
+
+    b.handlers["profile"] = raise_timeout
+
+    profiles = await s.get_profile(merge_workers=False)
+    assert set(profiles) == {a.address}
+    assert not isinstance(profiles[a.address], Exception)
+
+
+@pytest.mark.skipif(bokeh is None, reason="Test needs bokeh")
+@gen_cluster(client=True)
+async def test_performance_report_renders_offloaded(c, s, a, b):
+    from bokeh.io.state import curstate
+
+    from distributed.scheduler import _performance_report_template
+    from distributed.utils import offload
+
+    offloaded = []
+
+    async def record_offload(fn, *args, **kwargs):
+        offloaded.append(fn.__name__)
+        return await offload(fn, *args, **kwargs)
+
+    start = time()
+    await c.submit(inc, 1)
+    with mock.patch("distributed.scheduler.offload", record_offload):
+        inline, cdn = await asyncio.gather(
+            s.performance_report(start=start, last_count=0, mode="inline"),
+            s.performance_report(start=start, last_count=0, mode="cdn"),
+        )
+
+    for data in (inline, cdn):
+        assert "Dask Performance Report" in data
+        assert "Tasks Information" in data
+    assert "cdn.bokeh.org" not in inline
+    assert "cdn.bokeh.org" in cdn
+    assert offloaded.count("profile_to_figure") == 6
+    assert offloaded.count("render") == 2
+    # Rendering leaves Bokeh's global output state untouched
+    assert curstate().file is None
+    assert _performance_report_template() is _performance_report_template()
+
+
 @gen_cluster(
     client=True,
     config={
@@ -1917,6 +2069,7 @@ async def test_retire_names_str(c, s):
         await s.retire_workers(names=[0])
         assert all(f.done() for f in futures)
         assert len(b.data) == 10
+        assert s._addresses_by_name_str == {"1": {b.address}}
 
 
 @gen_cluster(
@@ -3257,6 +3410,31 @@ async def test_worker_reconnect_task_memory(c, s, a):
     }
 
 
+@gen_cluster(client=True, nthreads=[])
+async def test_worker_reconnect_with_task_and_dependency(c, s):
+    z = c.submit(inc, 1, key="z")
+    y = c.submit(inc, z, key="y")
+    x = c.submit(inc, y, key="x")
+    while "x" not in s.tasks:
+        await asyncio.sleep(0.01)
+    del y, z
+    while s.tasks["y"].who_wants:
+        await asyncio.sleep(0.01)
+
+    # A worker (re)connects holding both x and its dependency y. Storing x
+    # releases y before the scheduler gets to it.
+    w = Worker(s.address, nthreads=1)
+    for key, value in [("x", 4), ("y", 3)]:
+        w.tasks[key] = WorkerTaskState(key, state="memory", nbytes=sizeof(value))
+        w.data[key] = value
+    async with w:
+        assert await x == 4
+        assert "y" not in s.tasks or s.tasks["y"].state == "released"
+        while "y" in w.data:
+            await asyncio.sleep(0.01)
+        s.validate_state()
+
+
 @gen_cluster(client=True, nthreads=[("", 1)])
 async def test_worker_reconnect_task_memory_with_resources(c, s, a):
     async with Worker(s.address, resources={"A": 1}) as b:
@@ -3281,6 +3459,30 @@ async def test_worker_reconnect_task_memory_with_resources(c, s, a):
         }
 
 
+@gen_cluster(
+    client=True,
+    nthreads=[("127.0.0.1", 1, {"resources": {"A": 1}}), ("127.0.0.1", 1)],
+)
+async def test_worker_is_valid(c, s, a, b):
+    futs = [
+        c.submit(inc, 1, key="none"),
+        c.submit(inc, 2, key="worker", workers=[b.address]),
+        c.submit(inc, 3, key="host", workers=["127.0.0.1"]),
+        c.submit(inc, 4, key="other-host", workers=["127.0.0.2"]),
+        c.submit(inc, 5, key="resource", resources={"A": 1}),
+        c.submit(inc, 6, key="missing-resource", resources={"B": 1}),
+        c.submit(inc, 7, key="both", workers=[b.address], resources={"A": 1}),
+    ]
+    while len(s.tasks) < len(futs):
+        await asyncio.sleep(0.01)
+
+    for ts in s.tasks.values():
+        valid = s.valid_workers(ts)
+        for ws in s.workers.values():
+            expected = valid is None or ws in valid
+            assert s.worker_is_valid(ts, ws) == expected, (ts.key, ws.address)
+
+
 @gen_cluster(client=True, nthreads=[("", 1)] * 2)
 async def test_set_restrictions(c, s, a, b):
 
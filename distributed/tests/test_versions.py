@@ -137,6 +137,18 @@ async def test_version_warning_in_cluster(s, a, b):
         assert any("0.0.0" in line.message in line.message for line in w.logs)
 
 
+@gen_cluster(client=True)
+async def test_client_version_warning_cache(c, s, a, b):
+    assert len(s._client_version_warnings) == 1
+    async with Client(s.address, asynchronous=True):
+        assert len(s._client_version_warnings) == 1
+
+    async with Worker(s.address):
+        assert not s._client_version_warnings
+        async with Client(s.address, asynchronous=True):
+            assert len(s._client_version_warnings) == 1
+
+
 def test_python_version():
     required = get_versions()["packages"]
     assert required["python"] == ".".join(map(str, sys.version_info))
@@ -13,7 +13,7 @@ import distributed.system
 from distributed import Client, Event, Nanny, Worker, wait
 from distributed.core import Status
 from distributed.spill import has_zict_210
-from distributed.utils_test import captured_logger, gen_cluster, inc
+from distributed.utils_test import async_wait_for, captured_logger, gen_cluster, inc
 from distributed.worker_memory import parse_memory_limit
 
 requires_zict_210 = pytest.mark.skipif(
@@ -83,6 +83,16 @@ class FailToPickle:
         return self.reported_size
 
 
+class Sized:
+    """Cheap to pickle, but reports an arbitrary size to sizeof()"""
+
+    def __init__(self, size):
+        self.size = int(size)
+
+    def __sizeof__(self):
+        return self.size
+
+
 async def assert_basic_futures(c: Client) -> None:
     futures = c.map(inc, range(10))
     results = await c.gather(futures)
@@ -146,7 +156,7 @@ async def test_fail_to_pickle_target_2(c, s, a):
     config={
         "distributed.worker.memory.target": False,
         "distributed.worker.memory.spill": 0.7,
-        "distributed.worker.memory.monitor-interval": "10ms",
+        "distributed.worker.memory.monitor-interval": "1h",  # Driven manually
     },
 )
 async def test_fail_to_pickle_spill(c, s, a):
@@ -156,13 +166,8 @@ async def test_fail_to_pickle_spill(c, s, a):
     with captured_logger(logging.getLogger("distributed.spill")) as logs:
         bad = c.submit(FailToPickle, key="bad")
         await wait(bad)
-
-        # Must wait for memory monitor to kick in
-        while True:
-            logs_value = logs.getvalue()
-            if logs_value:
-                break
-            await asyncio.sleep(0.01)
+        await a.memory_manager.memory_monitor(a)
+        logs_value = logs.getvalue()
 
     assert "Failed to pickle" in logs_value
     assert "Traceback" in logs_value
@@ -192,15 +197,15 @@ async def test_spill_target_threshold(c, s, a):
     """
     assert not memory_monitor_running(a)
 
-    x = c.submit(lambda: "x" * 500, key="x")
+    x = c.submit(Sized, 500, key="x")
     await wait(x)
-    y = c.submit(lambda: "y" * 500, key="y")
+    y = c.submit(Sized, 500, key="y")
     await wait(y)
 
     assert set(a.data) == {"x", "y"}
     assert set(a.data.memory) == {"x", "y"}
 
-    z = c.submit(lambda: "z" * 500, key="z")
+    z = c.submit(Sized, 500, key="z")
     await wait(z)
     assert set(a.data) == {"x", "y", "z"}
     assert set(a.data.memory) == {"y", "z"}
@@ -254,8 +259,7 @@ async def test_spill_constrained(c, s, w):
     assert set(w.data.disk) == {x.key}
 
     del zb
-    while "zb" in w.data:
-        await asyncio.sleep(0.01)
+    await async_wait_for(lambda: "zb" not in w.data, timeout=5)
 
     # zc is individually smaller than max_spill, but the evicted key together with
     # x it exceeds max_spill
@@ -273,7 +277,7 @@ async def test_spill_constrained(c, s, w):
         "distributed.worker.memory.target": False,
         "distributed.worker.memory.spill": 0.7,
         "distributed.worker.memory.pause": False,
-        "distributed.worker.memory.monitor-interval": "10ms",
+        "distributed.worker.memory.monitor-interval": "1h",  # Driven manually
     },
 )
 async def test_spill_spill_threshold(c, s, a):
@@ -284,8 +288,9 @@ async def test_spill_spill_threshold(c, s, a):
     assert memory_monitor_running(a)
     a.monitor.get_process_memory = lambda: 800_000_000 if a.data.fast else 0
     x = c.submit(inc, 0, key="x")
-    while not a.data.disk:
-        await asyncio.sleep(0.01)
+    await wait(x)
+    await a.memory_manager.memory_monitor(a)
+    assert a.data.disk
     assert await x == 1
 
 
@@ -310,7 +315,7 @@ async def test_spill_spill_threshold(c, s, a):
     config={
         "distributed.worker.memory.spill": 0.7,
         "distributed.worker.memory.pause": False,
-        "distributed.worker.memory.monitor-interval": "10ms",
+        "distributed.worker.memory.monitor-interval": "1h",  # Driven manually
     },
 )
 async def test_spill_hysteresis(c, s, target, managed, expect_spilled):
@@ -332,19 +337,15 @@ async def test_spill_hysteresis(c, s, target, managed, expect_spilled):
             # Add 500MB (reported) process memory. Spilling must not happen.
             futures = [c.submit(C, pure=False) for _ in range(10)]
             await wait(futures)
-            await asyncio.sleep(0.1)
+            await a.memory_manager.memory_monitor(a)
             assert not a.data.disk
 
             # Add another 250MB unmanaged memory. This must trigger the spilling.
+            # A single run of the memory monitor keeps spilling until it gets below
+            # the target threshold.
             futures += [c.submit(C, pure=False) for _ in range(5)]
             await wait(futures)
-
-            # Wait until spilling starts. Then, wait until it stops.
-            prev_n = 0
-            while not a.data.disk or len(a.data.disk) > prev_n:
-                prev_n = len(a.data.disk)
-                await asyncio.sleep(0)
-
+            await a.memory_manager.memory_monitor(a)
             assert len(a.data.disk) == expect_spilled
 
 
@@ -369,24 +370,24 @@ async def test_pause_executor_manual(c, s, a):
 
     # Task that is running on the worker when the worker pauses
     x = c.submit(f, ev_x, key="x")
-    while a.executing_count != 1:
-        await asyncio.sleep(0.01)
+    await async_wait_for(lambda: a.executing_count == 1, timeout=5)
 
     # Task that is queued on the worker when the worker pauses
     y = c.submit(inc, 1, key="y")
-    while "y" not in a.tasks:
-        await asyncio.sleep(0.01)
+    await async_wait_for(lambda: "y" in a.tasks, timeout=5)
 
     a.status = Status.paused
     # Wait for sync to scheduler
-    while s.workers[a.address].status != Status.paused:
-        await asyncio.sleep(0.01)
+    await async_wait_for(
+        lambda: s.workers[a.address].status == Status.paused, timeout=5
+    )
 
     # Task that is queued on the scheduler when the worker pauses.
     # It is not sent to the worker.
     z = c.submit(inc, 2, key="z")
-    while "z" not in s.tasks or s.tasks["z"].state != "no-worker":
-        await asyncio.sleep(0.01)
+    await async_wait_for(
+        lambda: "z" in s.tasks and s.tasks["z"].state == "no-worker", timeout=5
+    )
     assert s.unrunnable == {s.tasks["z"]}
 
     # Test that a task that already started when the worker paused can complete
@@ -416,7 +417,7 @@ async def test_pause_executor_manual(c, s, a):
         "distributed.worker.memory.target": False,
         "distributed.worker.memory.spill": False,
         "distributed.worker.memory.pause": 0.8,
-        "distributed.worker.memory.monitor-interval": "10ms",
+        "distributed.worker.memory.monitor-interval": "1h",  # Driven manually
     },
 )
 async def test_pause_executor_with_memory_monitor(c, s, a):
@@ -433,27 +434,29 @@ async def test_pause_executor_with_memory_monitor(c, s, a):
 
     # Task that is running on the worker when the worker pauses
     x = c.submit(f, ev_x, key="x")
-    while a.executing_count != 1:
-        await asyncio.sleep(0.01)
+    await async_wait_for(lambda: a.executing_count == 1, timeout=5)
 
     with captured_logger(logging.getLogger("distributed.worker_memory")) as logger:
         # Task that is queued on the worker when the worker pauses
         y = c.submit(inc, 1, key="y")
-        while "y" not in a.tasks:
-            await asyncio.sleep(0.01)
+        await async_wait_for(lambda: "y" in a.tasks, timeout=5)
 
         # Hog the worker with 900MB unmanaged memory
         mocked_rss = 900_000_000
-        while s.workers[a.address].status != Status.paused:
-            await asyncio.sleep(0.01)
+        await a.memory_manager.memory_monitor(a)
+        assert a.status == Status.paused
+        await async_wait_for(
+            lambda: s.workers[a.address].status == Status.paused, timeout=5
+        )
 
         assert "Pausing worker" in logger.getvalue()
 
         # Task that is queued on the scheduler when the worker pauses.
         # It is not sent to the worker.
         z = c.submit(inc, 2, key="z")
-        while "z" not in s.tasks or s.tasks["z"].state != "no-worker":
-            await asyncio.sleep(0.01)
+        await async_wait_for(
+            lambda: "z" in s.tasks and s.tasks["z"].state == "no-worker", timeout=5
+        )
         assert s.unrunnable == {s.tasks["z"]}
 
         # Test that a task that already started when the worker paused can complete
@@ -471,6 +474,7 @@ async def test_pause_executor_with_memory_monitor(c, s, a):
         # Release the memory. Tasks that were queued on the worker are executed.
         # Tasks that were stuck on the scheduler are sent to the worker and executed.
         mocked_rss = 0
+        await a.memory_manager.memory_monitor(a)
         assert await y == 2
         assert await z == 3
 
@@ -540,7 +544,7 @@ async def test_override_data_nanny(c, s, n):
     client=True,
     nthreads=[("", 1)],
     worker_kwargs={"memory_limit": "1 GB", "data": UserDict},
-    config={"distributed.worker.memory.monitor-interval": "10ms"},
+    config={"distributed.worker.memory.monitor-interval": "1h"},  # Driven manually
 )
 async def test_override_data_vs_memory_monitor(c, s, a):
     a.monitor.get_process_memory = lambda: 801_000_000 if a.data else 0
@@ -555,12 +559,11 @@ async def test_override_data_vs_memory_monitor(c, s, a):
     with captured_logger(logging.getLogger("distributed.utils")) as logger:
         x = c.submit(C)
         await wait(x)
+        await a.memory_manager.memory_monitor(a)
 
         # The pause subsystem of the memory monitor has been tripped.
         # The spill subsystem hasn't.
-        while a.status != Status.paused:
-            await asyncio.sleep(0.01)
-        await asyncio.sleep(0.05)
+        assert a.status == Status.paused
 
     # This would happen if memory_monitor() tried to blindly call SpillBuffer.evict()
     assert "Traceback" not in logger.getvalue()
@@ -594,7 +597,7 @@ class ManualEvictDict(UserDict):
     worker_kwargs={"memory_limit": "1 GB", "data": ManualEvictDict},
     config={
         "distributed.worker.memory.pause": False,
-        "distributed.worker.memory.monitor-interval": "10ms",
+        "distributed.worker.memory.monitor-interval": "1h",  # Driven manually
     },
 )
 async def test_manual_evict_proto(c, s, a):
@@ -606,8 +609,8 @@ async def test_manual_evict_proto(c, s, a):
     assert isinstance(a.data, ManualEvictDict)
 
     futures = await c.scatter({"x": None, "y": None, "z": None})
-    while a.data.evicted != {"x", "y", "z"}:
-        await asyncio.sleep(0.01)
+    await a.memory_manager.memory_monitor(a)
+    assert a.data.evicted == {"x", "y", "z"}
 
 
 @pytest.mark.slow